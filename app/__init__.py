@@ -1,3 +1,10 @@
-from app.main import app
+def __getattr__(name):
+    # `uvicorn app:app` still works, but importing `app.tasks` from the Celery
+    # worker no longer builds the whole FastAPI application
+    if name == "app":
+        from app.main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __ALL__ = ["app"]
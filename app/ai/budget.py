@@ -0,0 +1,91 @@
+"""Local token estimates and extractive compaction of prompt texts.
+
+Token counts are estimated without a tokenizer: BPE vocabularies of the
+OpenAI models spend roughly one token per 4 Latin characters and one per
+2.5 Cyrillic ones. The estimate errs on the high side, which is the safe
+side for a budget.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+import math
+import re
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+|\n+")
+_WORD_RE = re.compile(r"\w{3,}")
+_NUMBER_RE = re.compile(r"\d")
+
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 2.5
+
+# a sentence sharing more than this share of its words with a kept one is a repeat
+REDUNDANT_OVERLAP = 0.6
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of `text` for OpenAI chat models."""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + other_chars / OTHER_CHARS_PER_TOKEN)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut text to about `max_tokens`, on a word boundary."""
+    # shrink by the estimated ratio until it fits; converges in a few steps
+    while estimate_tokens(text) > max_tokens and text:
+        keep = int(len(text) * max_tokens / estimate_tokens(text))
+        text = text[:keep].rsplit(" ", 1)[0] or text[:keep]
+    return text
+
+
+def compact_text(text: str, max_tokens: int) -> str:
+    """Fit text into `max_tokens` by keeping its most informative sentences.
+
+    Sentences are scored by the frequency of their words in the whole text
+    (words that recur carry the story), with a bonus for the lead sentence
+    and for numbers. The best ones that fit are kept in their original
+    order, skipping sentences that mostly repeat an already chosen one.
+    A text that already fits is returned unchanged.
+    """
+    text = (text or "").strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+    if len(sentences) < 2:
+        return _truncate(text, max_tokens)
+
+    freq = Counter(word for word in _WORD_RE.findall(text.lower()))
+
+    def score(index: int, sentence: str) -> float:
+        words = _WORD_RE.findall(sentence.lower())
+        if not words:
+            return 0.0
+        value = sum(math.log1p(freq[w]) for w in words) / len(words)
+        if index == 0:
+            value *= 2
+        if _NUMBER_RE.search(sentence):
+            value *= 1.2
+        return value
+
+    ranked = sorted(enumerate(sentences), key=lambda item: score(*item), reverse=True)
+    chosen: list[int] = []
+    chosen_words: list[set[str]] = []
+    used = 0
+    for index, sentence in ranked:
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            continue
+        words = set(_WORD_RE.findall(sentence.lower()))
+        if any(len(words & other) > REDUNDANT_OVERLAP * len(words) for other in chosen_words):
+            continue
+        chosen.append(index)
+        chosen_words.append(words)
+        used += cost
+
+    if not chosen:
+        return _truncate(sentences[0], max_tokens)
+    return " ".join(sentences[i] for i in sorted(chosen))
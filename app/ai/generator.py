@@ -2,14 +2,21 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 import logging
 import time
 
-from openai import APIError, RateLimitError
+from openai import BadRequestError, NotFoundError, UnprocessableEntityError
 
 from ..config import settings
 from ..models import NewsItem
+from ..resilience import CircuitOpenError, PermanentError, get_breaker
+from .budget import compact_text, estimate_tokens
 from .openai_client import get_openai_client
+from .routing import ModelTier, choose_tiers, record_call
+
+# the request itself is wrong: retrying the same prompt will not help
+PERMANENT_ERRORS = (BadRequestError, NotFoundError, UnprocessableEntityError)
 
 SYSTEM_PROMPT = "Ты редактор новостного Telegram-канала. Пиши ярко, кратко, без воды."
 
@@ -20,44 +27,129 @@ USER_TEMPLATE = """Сделай короткий пост для Telegram на 
 - если есть ссылка — добавь ее в конце отдельной строкой
 
 Заголовок: {title}
-Сводка: {summary}
+Текст: {text}
 Источник: {source}
 Ссылка: {url}
 """
 
+CLUSTER_TEMPLATE = """Сделай короткий пост для Telegram на русском по сюжету, о котором пишут несколько источников:
+- 1-2 абзаца, суммарно 300-700 символов
+- сведи факты из всех материалов, не повторяйся
+- добавь 2-4 подходящих emoji
+- в конце добавь call-to-action (вопрос/предложение обсудить)
+- в самом конце перечисли источники со ссылками, каждый отдельной строкой
+
+{items}"""
+
+CLUSTER_ITEM_TEMPLATE = """Материал {n}
+Заголовок: {title}
+Текст: {text}
+Источник: {source}
+Ссылка: {url}
+"""
+
+# floor for the per-item share of the input budget in cluster prompts
+CLUSTER_MIN_ITEM_TOKENS = 80
+
 log = logging.getLogger(__name__)
 
 
-def generate_telegram_post(news: NewsItem) -> str:
-    """Generate a Telegram post text for a given news item."""
-    client = get_openai_client()
+@dataclass(frozen=True)
+class NewsText:
+    """Plain copy of the news fields a prompt needs.
+
+    Generation runs in a helper thread (see app.status_writer), which must
+    not touch ORM instances of the task's session.
+    """
+    title: str
+    # full article body if it was fetched, else the feed summary
+    text: str
+    source: str
+    url: str
+
+    @classmethod
+    def of(cls, news: NewsItem) -> NewsText:
+        return cls(news.title, news.raw_text or news.summary, news.source, news.url or "")
 
+
+def generate_telegram_post(news: NewsText, priority: float = 1.0) -> str:
+    """Generate a Telegram post text for a given news item.
+
+    `priority` is the source weight; important sources skip the fast tier.
+    """
     prompt = USER_TEMPLATE.format(
         title=news.title,
-        summary=news.summary,
+        text=compact_text(news.text, settings.PROMPT_INPUT_BUDGET_TOKENS),
         source=news.source,
-        url=news.url or "",
+        url=news.url,
     )
+    return _complete(prompt, priority)
+
+
+def generate_cluster_post(news_items: list[NewsText], priority: float = 1.0) -> str:
+    """Generate one Telegram post for a story covered by several news items."""
+    item_budget = max(settings.PROMPT_INPUT_BUDGET_TOKENS // len(news_items), CLUSTER_MIN_ITEM_TOKENS)
+    items = "\n".join(
+        CLUSTER_ITEM_TEMPLATE.format(
+            n=n,
+            title=news.title,
+            text=compact_text(news.text, item_budget),
+            source=news.source,
+            url=news.url,
+        )
+        for n, news in enumerate(news_items, start=1)
+    )
+    return _complete(CLUSTER_TEMPLATE.format(items=items), priority)
+
+
+def _complete(prompt: str, priority: float = 1.0) -> str:
+    """Send the prompt to the model tier that fits it, falling back to the main model.
 
-    last_err: Exception | None = None
-    for attempt in range(5):
+    There are no in-process retries: if the main model fails, the error
+    propagates and the task reschedules the post with backoff. Errors that
+    retrying can not fix are raised as `PermanentError`.
+    """
+    input_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt)
+    *faster, main = choose_tiers(input_tokens, priority)
+    for tier in faster:
         try:
+            return _complete_with(tier, prompt, input_tokens)
+        except Exception as e:
+            log.warning("Model tier %s failed, falling back to %s: %s", tier.name, main.name, e)
+    return _complete_with(main, prompt, input_tokens)
+
+
+def _complete_with(tier: ModelTier, prompt: str, input_tokens: int) -> str:
+    """One call to the tier's model through its circuit breaker."""
+    client = get_openai_client()
+
+    started = time.perf_counter()
+    try:
+        with get_breaker(tier.breaker).guard(exclude=PERMANENT_ERRORS):
             resp = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+                model=tier.model,
                 messages=[
                     {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.8,
             )
-            return resp.choices[0].message.content.strip()
-        except (RateLimitError, APIError) as e:
-            last_err = e
-            log.warning("OpenAI API error on attempt %s/5: %s", attempt + 1, e)
-            time.sleep(1.5 * (attempt + 1))
-        except Exception as e:
-            # non-retryable
-            log.exception("OpenAI unexpected error")
-            raise e
+    except CircuitOpenError:
+        raise
+    except PERMANENT_ERRORS as e:
+        record_call(tier, time.perf_counter() - started, input_tokens, 0, ok=False)
+        raise PermanentError(f"OpenAI rejected the request: {e}") from e
+    except Exception:
+        record_call(tier, time.perf_counter() - started, input_tokens, 0, ok=False)
+        raise
 
-    raise RuntimeError(f"OpenAI failed after retries: {last_err}")
+    text = resp.choices[0].message.content.strip()
+    usage = resp.usage
+    record_call(
+        tier,
+        time.perf_counter() - started,
+        usage.prompt_tokens if usage else input_tokens,
+        usage.completion_tokens if usage else estimate_tokens(text),
+        ok=True,
+    )
+    return text
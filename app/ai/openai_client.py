@@ -1,6 +1,7 @@
 """OpenAI client factory with configured HTTP settings."""
 
 import logging
+import threading
 
 import httpx
 from openai import OpenAI
@@ -9,8 +10,20 @@ from app.config import settings
 
 log = logging.getLogger(__name__)
 
+_client: OpenAI | None = None
+_client_lock = threading.Lock()
+
 
 def get_openai_client() -> OpenAI:
+    """Return the process-wide OpenAI client, so its connection pool is reused."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_openai_client()
+    return _client
+
+
+def create_openai_client() -> OpenAI:
     """Create a configured OpenAI client with optional proxy support."""
     if not settings.OPENAI_API_KEY:
         raise RuntimeError("OPENAI_API_KEY is not set")
@@ -35,4 +48,7 @@ def get_openai_client() -> OpenAI:
         base_url=settings.OPENAI_BASE_URL,
         api_key=settings.OPENAI_API_KEY,
         http_client=http_client,
+        # the SDK would sleep between retries inside the worker;
+        # retries are rescheduled by the Celery tasks instead
+        max_retries=0,
     )
@@ -0,0 +1,88 @@
+"""Model tiers for post generation and their per-tier metrics.
+
+Short inputs from ordinary sources go to the fast tier (OPENAI_FAST_MODEL)
+when one is configured; everything else, and every fast-tier failure, goes
+to the main model (OPENAI_MODEL). Each call adds its latency and token
+counts to per-tier counters in Redis.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+
+import redis
+
+from app.config import settings
+from app.redis_client import get_redis
+
+log = logging.getLogger(__name__)
+
+STATS_KEY_PREFIX = "aibot:llm:stats"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    # circuit breaker name, see app.resilience
+    breaker: str
+
+
+def choose_tiers(input_tokens: int, priority: float) -> list[ModelTier]:
+    """Return the tiers to try in order; the main model is always last."""
+    main = ModelTier("main", settings.OPENAI_MODEL, "openai")
+    if (
+        settings.OPENAI_FAST_MODEL
+        and input_tokens <= settings.FAST_MODEL_MAX_INPUT_TOKENS
+        and priority <= settings.FAST_MODEL_MAX_PRIORITY
+    ):
+        return [ModelTier("fast", settings.OPENAI_FAST_MODEL, "openai:fast"), main]
+    return [main]
+
+
+def record_call(
+    tier: ModelTier,
+    latency: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+    ok: bool,
+) -> None:
+    """Add one model call to the tier counters."""
+    log.info(
+        "LLM call tier=%s model=%s ok=%s latency=%.2fs tokens=%s+%s",
+        tier.name, tier.model, ok, latency, prompt_tokens, completion_tokens,
+    )
+    key = f"{STATS_KEY_PREFIX}:{tier.name}"
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hincrby(key, "calls", 1)
+        pipe.hincrby(key, "errors", 0 if ok else 1)
+        pipe.hincrbyfloat(key, "latency_seconds", latency)
+        pipe.hincrby(key, "prompt_tokens", prompt_tokens)
+        pipe.hincrby(key, "completion_tokens", completion_tokens)
+        pipe.execute()
+    except redis.RedisError as e:
+        log.warning("LLM stats not recorded: %s", e)
+
+
+def tier_stats() -> dict[str, dict]:
+    """Return the counters of every tier with an average latency."""
+    stats = {}
+    for tier in ("fast", "main"):
+        raw = get_redis().hgetall(f"{STATS_KEY_PREFIX}:{tier}")
+        if not raw:
+            continue
+        values = {
+            (k.decode() if isinstance(k, bytes) else k): float(v)
+            for k, v in raw.items()
+        }
+        calls = int(values.get("calls", 0))
+        stats[tier] = {
+            "calls": calls,
+            "errors": int(values.get("errors", 0)),
+            "prompt_tokens": int(values.get("prompt_tokens", 0)),
+            "completion_tokens": int(values.get("completion_tokens", 0)),
+            "avg_latency_seconds": values.get("latency_seconds", 0.0) / calls if calls else 0.0,
+        }
+    return stats
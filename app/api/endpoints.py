@@ -1,24 +1,48 @@
 """API endpoints for CRUD operations and manual task triggers."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import desc, select
+from datetime import datetime
+from typing import Iterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+import redis
+from sqlalchemy import Select, delete, desc, insert, select, tuple_
 from sqlalchemy.orm import Session
 
 from app.api.schemas import (
+    BulkImportOut,
+    ChannelCreate,
+    ChannelOut,
+    ChannelUpdate,
+    DeliveryOut,
     KeywordCreate,
     KeywordOut,
     NewsOut,
     PostOut,
+    ShardOut,
     SourceCreate,
     SourceOut,
     SourceUpdate,
 )
-from app.database import get_db
-from app.models import Keyword, NewsItem, Post, Source
-from app.tasks import ai_generate_posts_task, publish_posts_task, run_pipeline_task
+from app.cache import bump_version, cached_json
+from app.config import settings
+from app.database import SessionLocal, get_db
+from app.models import Channel, Delivery, DeliveryStatus, Keyword, NewsItem, Post, PostStatus, Source
+from app.ai.routing import tier_stats
+from app.profiling import load_profile, to_speedscope
+from app.publishing import settle_posts
+from app.sharding import shard_load
 
 router = APIRouter()
 
+_sources_adapter = TypeAdapter(list[SourceOut])
+_keywords_adapter = TypeAdapter(list[KeywordOut])
+_news_adapter = TypeAdapter(list[NewsOut])
+_posts_adapter = TypeAdapter(list[PostOut])
+_channels_adapter = TypeAdapter(list[ChannelOut])
+_deliveries_adapter = TypeAdapter(list[DeliveryOut])
+
 
 @router.get("/health")
 def health():
@@ -33,14 +57,53 @@ def create_source(payload: SourceCreate, db: Session = Depends(get_db)):
     src = Source(**payload.model_dump())
     db.add(src)
     db.commit()
+    bump_version("sources")
     db.refresh(src)
     return src
 
 
 @router.get("/sources/", response_model=list[SourceOut])
-def list_sources(db: Session = Depends(get_db)):
+def list_sources(request: Request, db: Session = Depends(get_db)):
     """List configured sources in reverse creation order."""
-    return db.execute(select(Source).order_by(desc(Source.id))).scalars().all()
+    return cached_json(
+        request, "sources", _sources_adapter,
+        lambda: db.execute(select(Source).order_by(desc(Source.id))).scalars().all(),
+    )
+
+
+def _check_import_size(payload: list) -> None:
+    if len(payload) > settings.IMPORT_MAX_ROWS:
+        raise HTTPException(413, f"At most {settings.IMPORT_MAX_ROWS} rows per import")
+
+
+@router.post("/sources/bulk", response_model=BulkImportOut)
+def import_sources(payload: list[SourceCreate], db: Session = Depends(get_db)):
+    """Create many sources in one transaction.
+
+    Rows whose (type, url) already exists, or repeats earlier in the payload,
+    are skipped.
+    """
+    _check_import_size(payload)
+    existing = set(
+        db.execute(
+            select(Source.type, Source.url)
+            .where(tuple_(Source.type, Source.url).in_([(p.type, p.url) for p in payload]))
+        ).all())
+    existing = {(type_.value, url) for type_, url in existing}
+
+    rows = []
+    for item in payload:
+        key = (item.type, item.url)
+        if key in existing:
+            continue
+        existing.add(key)
+        rows.append(item.model_dump())
+
+    if rows:
+        db.execute(insert(Source), rows)
+        db.commit()
+        bump_version("sources")
+    return {"created": len(rows), "skipped": len(payload) - len(rows)}
 
 
 @router.patch("/sources/{source_id}", response_model=SourceOut)
@@ -54,6 +117,7 @@ def update_source(source_id: int, payload: SourceUpdate, db: Session = Depends(g
         setattr(src, k, v)
 
     db.commit()
+    bump_version("sources")
     db.refresh(src)
     return src
 
@@ -66,28 +130,59 @@ def delete_source(source_id: int, db: Session = Depends(get_db)):
         raise HTTPException(404, "Source not found")
     db.delete(src)
     db.commit()
+    bump_version("sources")
     return {"deleted": True}
 
 
+@router.get("/shards/", response_model=list[ShardOut])
+def list_shards(db: Session = Depends(get_db)):
+    """Return live collection shards with their source count and load."""
+    try:
+        return shard_load(db)
+    except redis.RedisError as e:
+        raise HTTPException(503, f"Shard membership unavailable: {e}")
+
+
 # ---- Keywords CRUD
 @router.post("/keywords/", response_model=KeywordOut)
 def create_keyword(payload: KeywordCreate, db: Session = Depends(get_db)):
     """Create a keyword for filtering content."""
-    kw = Keyword(word=payload.word.strip())
+    kw = Keyword(word=payload.word.strip(), weight=payload.weight)
     db.add(kw)
     try:
         db.commit()
     except Exception:
         db.rollback()
         raise HTTPException(400, "Keyword already exists or invalid")
+    bump_version("keywords")
     db.refresh(kw)
     return kw
 
 
+@router.post("/keywords/bulk", response_model=BulkImportOut)
+def import_keywords(payload: list[KeywordCreate], db: Session = Depends(get_db)):
+    """Create many keywords in one transaction, skipping words that already exist."""
+    _check_import_size(payload)
+    words = {item.word.strip(): item.weight for item in payload}
+    existing = set(
+        db.execute(select(Keyword.word).where(Keyword.word.in_(list(words)))).scalars()
+    )
+
+    rows = [{"word": word, "weight": weight} for word, weight in words.items() if word not in existing]
+    if rows:
+        db.execute(insert(Keyword), rows)
+        db.commit()
+        bump_version("keywords")
+    return {"created": len(rows), "skipped": len(payload) - len(rows)}
+
+
 @router.get("/keywords/", response_model=list[KeywordOut])
-def list_keywords(db: Session = Depends(get_db)):
+def list_keywords(request: Request, db: Session = Depends(get_db)):
     """List configured keywords."""
-    return db.execute(select(Keyword).order_by(desc(Keyword.id))).scalars().all()
+    return cached_json(
+        request, "keywords", _keywords_adapter,
+        lambda: db.execute(select(Keyword).order_by(desc(Keyword.id))).scalars().all(),
+    )
 
 
 @router.delete("/keywords/{keyword_id}")
@@ -98,38 +193,227 @@ def delete_keyword(keyword_id: int, db: Session = Depends(get_db)):
         raise HTTPException(404, "Keyword not found")
     db.delete(kw)
     db.commit()
+    bump_version("keywords")
     return {"deleted": True}
 
 
 # ---- News / Posts
 @router.get("/news/", response_model=list[NewsOut])
-def list_news(limit: int = 50, db: Session = Depends(get_db)):
+def list_news(request: Request, limit: int = 50, db: Session = Depends(get_db)):
     """Return latest news items."""
-    return db.execute(select(NewsItem).order_by(desc(NewsItem.published_at)).limit(limit)).scalars().all()
+    return cached_json(
+        request, "news", _news_adapter,
+        lambda: db.execute(select(NewsItem).order_by(desc(NewsItem.published_at)).limit(limit)).scalars().all(),
+    )
 
 
 @router.get("/posts/", response_model=list[PostOut])
-def list_posts(limit: int = 50, db: Session = Depends(get_db)):
+def list_posts(request: Request, limit: int = 50, db: Session = Depends(get_db)):
     """Return latest generated posts."""
-    return db.execute(select(Post).order_by(desc(Post.id)).limit(limit)).scalars().all()
+    return cached_json(
+        request, "posts", _posts_adapter,
+        lambda: db.execute(select(Post).order_by(desc(Post.id)).limit(limit)).scalars().all(),
+    )
+
+
+# ---- Channels CRUD
+@router.post("/channels/", response_model=ChannelOut)
+def create_channel(payload: ChannelCreate, db: Session = Depends(get_db)):
+    """Create a publication channel; unset rates take the CHANNEL_* defaults."""
+    if db.execute(select(Channel.id).where(Channel.name == payload.name)).first():
+        raise HTTPException(409, "Channel already exists")
+    channel = Channel(**payload.model_dump(exclude_none=True))
+    db.add(channel)
+    db.commit()
+    bump_version("channels")
+    db.refresh(channel)
+    return channel
+
+
+@router.get("/channels/", response_model=list[ChannelOut])
+def list_channels(request: Request, db: Session = Depends(get_db)):
+    """List publication channels."""
+    return cached_json(
+        request, "channels", _channels_adapter,
+        lambda: db.execute(select(Channel).order_by(Channel.id)).scalars().all(),
+    )
+
+
+@router.patch("/channels/{channel_id}", response_model=ChannelOut)
+def update_channel(channel_id: int, payload: ChannelUpdate, db: Session = Depends(get_db)):
+    """Update a publication channel. Rules apply to posts routed from now on."""
+    channel = db.get(Channel, channel_id)
+    if not channel:
+        raise HTTPException(404, "Channel not found")
+
+    for k, v in payload.model_dump(exclude_unset=True).items():
+        setattr(channel, k, v)
+
+    db.commit()
+    bump_version("channels")
+    db.refresh(channel)
+    return channel
+
+
+@router.delete("/channels/{channel_id}")
+def delete_channel(channel_id: int, db: Session = Depends(get_db)):
+    """Delete a publication channel together with its deliveries."""
+    channel = db.get(Channel, channel_id)
+    if not channel:
+        raise HTTPException(404, "Channel not found")
+    post_ids = (
+        db.execute(select(Delivery.post_id).where(Delivery.channel_id == channel_id))
+        .scalars()
+        .all())
+    db.execute(delete(Delivery).where(Delivery.channel_id == channel_id))
+    db.delete(channel)
+    # posts that only waited for this channel are now published or failed
+    settle_posts(db, post_ids)
+    db.commit()
+    bump_version("channels", "posts")
+    return {"deleted": True}
+
+
+@router.get("/deliveries/", response_model=list[DeliveryOut])
+def list_deliveries(
+    request: Request,
+    post_id: int | None = None,
+    channel_id: int | None = None,
+    status: DeliveryStatus | None = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+):
+    """Return latest deliveries, optionally of one post, channel or status."""
+    query = select(Delivery).order_by(desc(Delivery.id)).limit(limit)
+    if post_id is not None:
+        query = query.where(Delivery.post_id == post_id)
+    if channel_id is not None:
+        query = query.where(Delivery.channel_id == channel_id)
+    if status is not None:
+        query = query.where(Delivery.status == status)
+    # delivery changes bump the posts version
+    return cached_json(
+        request, "posts", _deliveries_adapter,
+        lambda: db.execute(query).scalars().all(),
+    )
+
+# ---- NDJSON export
+def _stream_ndjson(query: Select, schema: type[BaseModel]) -> StreamingResponse:
+    """Stream query rows as NDJSON from a server-side cursor.
+
+    The generator owns its session: the request-scoped one is closed before
+    the body is sent.
+    """
+    def rows() -> Iterator[str]:
+        with SessionLocal() as db:
+            result = db.execute(
+                query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            ).scalars()
+            for partition in result.partitions():
+                # the identity map holds objects weakly, so a sent batch is freed
+                yield "".join(
+                    schema.model_validate(obj).model_dump_json() + "\n" for obj in partition
+                )
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@router.get("/export/news")
+def export_news(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    source: str | None = None,
+):
+    """Export news items as NDJSON, filtered by `published_at` and source name."""
+    query = select(NewsItem).order_by(NewsItem.id)
+    if since is not None:
+        query = query.where(NewsItem.published_at >= since)
+    if until is not None:
+        query = query.where(NewsItem.published_at < until)
+    if source is not None:
+        query = query.where(NewsItem.source == source)
+    return _stream_ndjson(query, NewsOut)
+
+
+@router.get("/export/posts")
+def export_posts(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    status: list[PostStatus] | None = Query(default=None),
+):
+    """Export posts as NDJSON, filtered by `created_at` and status (repeatable)."""
+    query = select(Post).order_by(Post.id)
+    if since is not None:
+        query = query.where(Post.created_at >= since)
+    if until is not None:
+        query = query.where(Post.created_at < until)
+    if status:
+        query = query.where(Post.status.in_(status))
+    return _stream_ndjson(query, PostOut)
+
+
+@router.get("/export/sources")
+def export_sources():
+    """Export sources as NDJSON, e.g. to re-import them elsewhere."""
+    return _stream_ndjson(select(Source).order_by(Source.id), SourceOut)
+
 
 # ---- Manual triggers (Celery)
+def _send(task, profile: bool) -> dict:
+    """Queue a task; with `profile` it runs under the sampling profiler."""
+    if not profile:
+        return {"task_id": task.delay().id}
+    result = task.apply_async(headers={"profile": True})
+    return {"task_id": result.id, "profile": f"{settings.API_PREFIX}/profiles/{result.id}"}
+
+
 @router.post("/pipeline/run")
-def run_pipeline():
+def run_pipeline(profile: bool = False):
     """Run full pipeline: collect, generate, publish."""
-    task = run_pipeline_task.delay()
-    return {"task_id": task.id}
+    from app.tasks import run_pipeline_task
+
+    return _send(run_pipeline_task, profile)
 
 
 @router.post("/generate/")
-def generate_manual():
+def generate_manual(profile: bool = False):
     """Trigger AI post generation for pending items."""
-    task = ai_generate_posts_task.delay()
-    return {"task_id": task.id}
+    from app.tasks import ai_generate_posts_task
+
+    return _send(ai_generate_posts_task, profile)
 
 
 @router.post("/publish/")
-def publish_manual():
+def publish_manual(profile: bool = False):
     """Trigger publishing for generated posts."""
-    task = publish_posts_task.delay()
-    return {"task_id": task.id}
+    from app.tasks import publish_posts_task
+
+    return _send(publish_posts_task, profile)
+
+
+@router.get("/llm/stats")
+def llm_stats():
+    """Return per-tier model call counts, token totals and average latency."""
+    try:
+        return tier_stats()
+    except redis.RedisError as e:
+        raise HTTPException(503, f"Stats storage unavailable: {e}")
+
+
+# ---- Profiles
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, format: Literal["collapsed", "speedscope"] = "collapsed"):
+    """Return a stored profile as collapsed stacks or speedscope JSON."""
+    try:
+        text = load_profile(profile_id)
+    except redis.RedisError as e:
+        raise HTTPException(503, f"Profile storage unavailable: {e}")
+    if text is None:
+        raise HTTPException(404, "Profile not found (still running or expired)")
+
+    if format == "speedscope":
+        return JSONResponse(
+            to_speedscope(text, profile_id),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+        )
+    return PlainTextResponse(text)
@@ -13,6 +13,7 @@ class SourceCreate(BaseModel):
     name: str
     url: str
     enabled: bool = True
+    weight: float = Field(default=1.0, ge=0)
 
 
 class SourceUpdate(BaseModel):
@@ -21,6 +22,7 @@ class SourceUpdate(BaseModel):
     name: Optional[str] = None
     url: Optional[str] = None
     enabled: Optional[bool] = None
+    weight: Optional[float] = Field(default=None, ge=0)
 
 
 class SourceOut(BaseModel):
@@ -31,6 +33,87 @@ class SourceOut(BaseModel):
     name: str
     url: str
     enabled: bool
+    weight: Optional[float] = None
+    poll_interval_seconds: Optional[int] = None
+    next_poll_at: Optional[datetime] = None
+    last_polled_at: Optional[datetime] = None
+    error_count: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ShardOut(BaseModel):
+    """Load of one collection shard (worker node)."""
+
+    node: str
+    queue: str
+    last_heartbeat: datetime
+    sources: int
+    polls_per_hour: float
+    dispatched: int
+
+
+class BulkImportOut(BaseModel):
+    """Result of a bulk import."""
+
+    created: int
+    skipped: int
+
+
+class ChannelCreate(BaseModel):
+    """Payload for creating a publication channel."""
+
+    name: str = Field(min_length=1, max_length=255)
+    chat: Optional[str] = None
+    enabled: bool = True
+    keywords: list[str] = []
+    sources: list[str] = []
+    rate_per_hour: Optional[int] = Field(default=None, ge=0)
+    min_interval_seconds: Optional[int] = Field(default=None, ge=0)
+
+
+class ChannelUpdate(BaseModel):
+    """Payload for updating a publication channel."""
+
+    name: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    chat: Optional[str] = None
+    enabled: Optional[bool] = None
+    keywords: Optional[list[str]] = None
+    sources: Optional[list[str]] = None
+    rate_per_hour: Optional[int] = Field(default=None, ge=0)
+    min_interval_seconds: Optional[int] = Field(default=None, ge=0)
+
+
+class ChannelOut(BaseModel):
+    """Serialized publication channel for API responses."""
+
+    id: int
+    name: str
+    chat: Optional[str]
+    enabled: bool
+    keywords: list[str]
+    sources: list[str]
+    rate_per_hour: int
+    min_interval_seconds: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class DeliveryOut(BaseModel):
+    """Serialized delivery of a post to a channel."""
+
+    id: int
+    post_id: int
+    channel_id: int
+    status: str
+    error: Optional[str]
+    retry_count: int
+    next_retry_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
     created_at: datetime
 
     class Config:
@@ -41,6 +124,7 @@ class KeywordCreate(BaseModel):
     """Payload for creating a keyword."""
 
     word: str = Field(min_length=1, max_length=128)
+    weight: float = Field(default=1.0, ge=0)
 
 
 class KeywordOut(BaseModel):
@@ -48,6 +132,7 @@ class KeywordOut(BaseModel):
 
     id: int
     word: str
+    weight: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -79,6 +164,11 @@ class PostOut(BaseModel):
     published_at: Optional[datetime]
     status: str
     error: Optional[str]
+    score: Optional[float] = None
+    generated_at: Optional[datetime] = None
+    merged_into_id: Optional[int] = None
+    retry_count: Optional[int] = None
+    next_retry_at: Optional[datetime] = None
     created_at: datetime
 
     class Config:
@@ -0,0 +1,197 @@
+"""Bloom filter of already-seen news fingerprints.
+
+A negative answer means the fingerprint was never stored, so collection can
+insert the item without asking the database. A positive answer may be a false
+positive and is confirmed with a DB lookup. The bit array lives in a Redis
+bitmap so all workers share it, or in process memory when `BLOOM_SHARED` is off.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Iterable
+import uuid
+
+import redis
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import NewsItem, NewsTombstone
+from app.redis_client import get_redis
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "aibot:bloom:fingerprints"
+REBUILD_BATCH_SIZE = 5000
+REBUILD_LOCK_SECONDS = 600
+
+
+def filter_size(capacity: int, error_rate: float, max_bytes: int) -> tuple[int, int]:
+    """Return (bit count, hash count) for the wanted capacity and error rate."""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits = max(8, min(bits, max_bytes * 8))
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class FingerprintFilter:
+    """Bloom filter over SHA-256 hex fingerprints."""
+
+    def __init__(self, capacity: int, error_rate: float, max_bytes: int, shared: bool):
+        self.bits, self.hashes = filter_size(capacity, error_rate, max_bytes)
+        self.shared = shared
+        # size is part of the key, so workers with different settings never mix bits
+        self.key = f"{KEY_PREFIX}:{self.bits}:{self.hashes}"
+        self._local: bytearray | None = None if shared else bytearray((self.bits + 7) // 8)
+
+    def _positions(self, fingerprint: str) -> list[int]:
+        # fingerprints are already uniform hashes: split into two 64-bit
+        # halves and use double hashing instead of rehashing k times
+        h1 = int(fingerprint[:16], 16)
+        h2 = int(fingerprint[16:32], 16) | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add_many(self, fingerprints: Iterable[str], key: str | None = None) -> None:
+        """Mark fingerprints as seen."""
+        if not self.shared:
+            for fp in fingerprints:
+                for pos in self._positions(fp):
+                    self._local[pos >> 3] |= 1 << (pos & 7)
+            return
+
+        pipe = get_redis().pipeline(transaction=False)
+        for fp in fingerprints:
+            for pos in self._positions(fp):
+                pipe.setbit(key or self.key, pos, 1)
+        try:
+            pipe.execute()
+        except redis.RedisError as e:
+            log.warning("Bloom filter update failed: %s", e)
+
+    def might_contain_many(self, fingerprints: list[str]) -> list[bool]:
+        """Return False for fingerprints that were definitely never added.
+
+        If Redis is unavailable every answer is True, so callers fall back to
+        the database.
+        """
+        if not self.shared:
+            return [
+                all(self._local[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fp))
+                for fp in fingerprints
+            ]
+
+        pipe = get_redis().pipeline(transaction=False)
+        for fp in fingerprints:
+            for pos in self._positions(fp):
+                pipe.getbit(self.key, pos)
+        try:
+            bits = pipe.execute()
+        except redis.RedisError as e:
+            log.warning("Bloom filter lookup failed: %s", e)
+            return [True] * len(fingerprints)
+
+        return [
+            all(bits[i * self.hashes:(i + 1) * self.hashes])
+            for i in range(len(fingerprints))
+        ]
+
+    def is_built(self) -> bool:
+        """Return True if the filter already holds data."""
+        if not self.shared:
+            return any(self._local)
+        try:
+            return bool(get_redis().exists(self.key))
+        except redis.RedisError:
+            return False
+
+    def rebuild(self, db: Session) -> int | None:
+        """Refill the filter from stored and archived fingerprints and return their count.
+
+        The shared filter is rebuilt by one process at a time: returns None
+        when another process already holds the rebuild lock.
+        """
+        if not self.shared:
+            self._local = bytearray((self.bits + 7) // 8)
+            return self._fill(db, None)
+
+        lock = get_redis().lock(f"{self.key}:lock", timeout=REBUILD_LOCK_SECONDS)
+        if not lock.acquire(blocking=False):
+            log.info("Bloom filter is being rebuilt by another process")
+            return None
+        # a rebuild outliving its lock still writes to its own temp key
+        target = f"{self.key}:rebuild:{uuid.uuid4().hex}"
+        try:
+            count = self._fill(db, target)
+            if count:
+                get_redis().rename(target, self.key)
+            else:
+                get_redis().delete(self.key)
+        finally:
+            get_redis().delete(target)
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                pass
+        return count
+
+    def _fill(self, db: Session, target: str | None) -> int:
+        count = 0
+        batch: list[str] = []
+        rows = db.execute(
+            union_all(select(NewsItem.fingerprint), select(NewsTombstone.fingerprint))
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        ).scalars()
+        for fp in rows:
+            batch.append(fp)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                self.add_many(batch, key=target)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.add_many(batch, key=target)
+            count += len(batch)
+
+        log.info("Bloom filter rebuilt: %s fingerprints, %s bits, %s hashes", count, self.bits, self.hashes)
+        return count
+
+
+fingerprint_filter = FingerprintFilter(
+    capacity=settings.BLOOM_CAPACITY,
+    error_rate=settings.BLOOM_ERROR_RATE,
+    max_bytes=settings.BLOOM_MAX_BYTES,
+    shared=settings.BLOOM_SHARED,
+)
+
+
+def find_existing(db: Session, fingerprints: list[str]) -> set[str]:
+    """Return the subset of fingerprints that are already stored or archived.
+
+    Only filter positives are looked up in `news_items`. Tombstones are always
+    checked: the filter can miss (a lost Redis key, a process that never
+    warmed it), and a missed news item is only a duplicate insert that the
+    unique constraint rejects, while a missed tombstone would bring archived
+    news back.
+    """
+    if not fingerprints:
+        return set()
+    if not settings.BLOOM_ENABLED:
+        candidates = fingerprints
+    else:
+        maybe = fingerprint_filter.might_contain_many(fingerprints)
+        candidates = [fp for fp, hit in zip(fingerprints, maybe) if hit]
+
+    query = select(NewsTombstone.fingerprint).where(NewsTombstone.fingerprint.in_(fingerprints))
+    if candidates:
+        query = union_all(
+            select(NewsItem.fingerprint).where(NewsItem.fingerprint.in_(candidates)),
+            query,
+        )
+    return set(db.execute(query).scalars().all())
+
+
+def remember(fingerprints: list[str]) -> None:
+    """Add freshly stored fingerprints to the filter."""
+    if settings.BLOOM_ENABLED and fingerprints:
+        fingerprint_filter.add_many(fingerprints)
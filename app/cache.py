@@ -0,0 +1,178 @@
+"""Response cache for read-heavy API endpoints.
+
+Serialized JSON bodies are stored in Redis and in a small in-process LRU.
+Every cache key embeds the version of its namespace (``news``, ``posts``,
+``sources``, ``keywords``); writers call `bump_version` instead of deleting
+keys, so stale entries simply stop being addressed and expire on their own.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+import redis
+
+from app.config import settings
+from app.redis_client import get_redis
+from app.resilience import CircuitBreaker, CircuitOpenError
+
+if TYPE_CHECKING:
+    from fastapi import Request, Response
+    from pydantic import TypeAdapter
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "aibot:cache"
+
+
+class _LocalCache:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, max_items: int):
+        self._max_items = max_items
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_items:
+                self._items.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+
+_local = _LocalCache(settings.CACHE_LOCAL_MAX_ITEMS)
+
+# one failed version read bypasses the cache for CACHE_RETRY_SECONDS
+_breaker = CircuitBreaker("cache", failure_threshold=1, reset_timeout=settings.CACHE_RETRY_SECONDS)
+
+
+def _version_key(namespace: str) -> str:
+    return f"{KEY_PREFIX}:version:{namespace}"
+
+
+def get_version(namespace: str) -> int | None:
+    """Return the namespace version, or None if Redis is unavailable."""
+    key = _version_key(namespace)
+    version = _local.get(key)
+    if version is not None:
+        return version
+
+    try:
+        with _breaker.guard():
+            version = int(get_redis().get(key) or 0)
+    except CircuitOpenError:
+        return None
+    except redis.RedisError as e:
+        log.warning("Response cache disabled for %ss, Redis unavailable: %s", settings.CACHE_RETRY_SECONDS, e)
+        return None
+
+    _local.set(key, version, settings.CACHE_LOCAL_TTL_SECONDS)
+    return version
+
+
+def bump_version(*namespaces: str) -> None:
+    """Invalidate cached responses for the given namespaces."""
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        _local.pop(key)
+        try:
+            get_redis().incr(key)
+        except redis.RedisError as e:
+            log.warning("Cache invalidation failed for %s: %s", namespace, e)
+
+
+def _make_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _load(key: str) -> tuple[str, bytes] | None:
+    entry = _local.get(key)
+    if entry is not None:
+        return entry
+
+    try:
+        body = get_redis().get(key)
+    except redis.RedisError as e:
+        log.warning("Response cache read failed: %s", e)
+        return None
+    if body is None:
+        return None
+
+    entry = (_make_etag(body), body)
+    _local.set(key, entry, settings.CACHE_LOCAL_TTL_SECONDS)
+    return entry
+
+
+def _store(key: str, entry: tuple[str, bytes]) -> None:
+    _local.set(key, entry, settings.CACHE_LOCAL_TTL_SECONDS)
+    try:
+        get_redis().set(key, entry[1], ex=settings.CACHE_TTL_SECONDS)
+    except redis.RedisError as e:
+        log.warning("Response cache write failed: %s", e)
+
+
+def cached_json(
+    request: Request,
+    namespace: str,
+    adapter: TypeAdapter,
+    build: Callable[[], Any],
+) -> Response:
+    """Serve a JSON response from cache, building and storing it on a miss.
+
+    `build` returns ORM objects that `adapter` validates and serializes.
+    Responses carry an ETag; a matching `If-None-Match` gets a bodiless 304.
+    """
+    # imported here so Celery workers can call `bump_version` without FastAPI
+    from fastapi import Response
+
+    version = get_version(namespace) if settings.CACHE_ENABLED else None
+
+    entry = None
+    key = None
+    if version is not None:
+        params = sorted(request.query_params.multi_items())
+        query = "&".join(f"{k}={v}" for k, v in params)
+        key = f"{KEY_PREFIX}:{namespace}:{version}:{request.url.path}?{query}"
+        entry = _load(key)
+
+    if entry is None:
+        body = adapter.dump_json(adapter.validate_python(build(), from_attributes=True))
+        entry = (_make_etag(body), body)
+        if key is not None:
+            _store(key, entry)
+
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -18,13 +18,96 @@ class Settings(BaseSettings):
     DATABASE_URL: str | None = None
     LOG_FOLDER: str | None = None
     LOG_LEVEL: int = logging.INFO
+    LOG_ASYNC: bool = False
+    LOG_JSON: bool = False
+    LOG_SAMPLE_PER_SECOND: float = 5
+
+    # sampling profiler: every task, or per call (?profile=true) / request (X-Profile header)
+    PROFILE_TASKS: bool = False
+    PROFILE_REQUESTS_ENABLED: bool = False
+    PROFILE_INTERVAL_MS: int = 10
+    PROFILE_TTL_SECONDS: int = 24 * 3600
 
     REDIS_URL: str = "redis://localhost:6379/0"
     POLL_INTERVAL_MINUTES: int = 30
+    POLL_MIN_INTERVAL_MINUTES: int = 5
+    POLL_MAX_INTERVAL_MINUTES: int = 360
+    POLL_TARGET_NEW_ITEMS: int = 3
+    POLL_ERROR_BACKOFF_FACTOR: float = 2.0
+    POLL_TICK_SECONDS: int = 60
+
+    # route collection to per-node queues by consistent hashing of source ids
+    SHARDING_ENABLED: bool = False
+    SHARD_VNODES: int = 64
+    SHARD_HEARTBEAT_SECONDS: int = 15
+    SHARD_MEMBER_TTL_SECONDS: int = 60
+    SHARD_CLAIM_TIMEOUT_SECONDS: int = 600
+
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 60
+    CACHE_LOCAL_TTL_SECONDS: float = 1.0
+    CACHE_LOCAL_MAX_ITEMS: int = 256
+    # after a Redis error the cache is bypassed for this long instead of waiting on every request
+    CACHE_RETRY_SECONDS: float = 5.0
+
+    # NDJSON export fetches rows from a server-side cursor in batches of this size
+    EXPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ROWS: int = 10_000
+
+    BLOOM_ENABLED: bool = True
+    BLOOM_SHARED: bool = True
+    BLOOM_CAPACITY: int = 1_000_000
+    BLOOM_ERROR_RATE: float = 0.001
+    BLOOM_MAX_BYTES: int = 16 * 1024 * 1024
+
+    COMPACT_STORAGE: bool = False
+    COMPACT_TEXT_MIN_CHARS: int = 256
+
+    RETENTION_DAYS: int | None = None
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_MAX_BATCHES: int = 20
+    RETENTION_INTERVAL_MINUTES: int = 60
+    ARCHIVE_FOLDER: str | None = None
+
+    ARTICLE_FETCH_ENABLED: bool = True
+    ARTICLE_MAX_PER_HOST: int = 4
+    ARTICLE_HOST_DELAY_SECONDS: float = 0.5
+    ARTICLE_MAX_BYTES: int = 2 * 1024 * 1024
+    ARTICLE_TIMEOUT_SECONDS: float = 15.0
+    ARTICLE_MAX_TEXT_CHARS: int = 10000
+
+    GENERATION_TOP_K: int = 10
+    GENERATION_WINDOW_MINUTES: int = 60
+    SCORING_RECENCY_HALF_LIFE_HOURS: float = 6.0
+    SCORING_MAX_AGE_HOURS: int = 48
+    SCORING_NOVELTY_HOURS: int = 24
+
+    CLUSTER_ENABLED: bool = True
+    CLUSTER_SIMILARITY: float = 0.5
+    CLUSTER_BATCH_SIZE: int = 1024
+
+    # consecutive failures before a backend circuit opens, and how long it stays open
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_SECONDS: int = 60
+    # failed posts are retried with exponential backoff, then left failed
+    RETRY_MAX_ATTEMPTS: int = 5
+    RETRY_BASE_SECONDS: int = 30
+    RETRY_MAX_SECONDS: int = 3600
+    RETRY_SWEEP_MINUTES: int = 5
+
+    # post status updates are committed every N posts or T milliseconds; 1 = per post
+    STATUS_BATCH_SIZE: int = 20
+    STATUS_BATCH_MAX_MS: int = 1000
 
     OPENAI_BASE_URL: str | None = None
     OPENAI_API_KEY: str | None = None
     OPENAI_MODEL: str = "gpt-4o-mini"
+    # optional cheaper model for short inputs from sources with weight <= FAST_MODEL_MAX_PRIORITY
+    OPENAI_FAST_MODEL: str | None = None
+    FAST_MODEL_MAX_INPUT_TOKENS: int = 600
+    FAST_MODEL_MAX_PRIORITY: float = 1.0
+    # news text in a prompt is compacted to about this many tokens
+    PROMPT_INPUT_BUDGET_TOKENS: int = 1500
 
     TG_API_ID: int | None = None
     TG_API_HASH: str | None = None
@@ -32,6 +115,18 @@ class Settings(BaseSettings):
     TG_BOT_SESSION: str | None = str(BASE_DIR / "tg.bot.session")
     TG_BOT_TOKEN: str | None = None
     TG_TARGET_CHANNEL: str | None = None
+    # defaults for new channels; without any channel, TG_TARGET_CHANNEL becomes the "default" one
+    CHANNEL_RATE_PER_HOUR: int = 30
+    CHANNEL_MIN_INTERVAL_SECONDS: int = 5
+    # longer waits for the send budget reschedule the delivery task instead of sleeping
+    CHANNEL_MAX_INLINE_WAIT_SECONDS: int = 30
+
+    # push ingestion (python -m app.news_parser.tg_listener); must not share TG_SESSION
+    TG_LISTENER_SESSION: str | None = str(BASE_DIR / "tg.listener.session")
+    TG_LISTENER_BATCH_SIZE: int = 50
+    TG_LISTENER_BATCH_MS: int = 500
+    TG_LISTENER_RELOAD_SECONDS: int = 10
+    TG_LISTENER_RECONNECT_SECONDS: int = 5
 
 
 settings = Settings()
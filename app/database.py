@@ -1,5 +1,6 @@
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, literal
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import settings, BASE_DIR
 import logging
@@ -22,6 +23,28 @@ engine = create_engine(
     future=True
 )
 
+if engine.dialect.name == "sqlite":
+    # pysqlite starts transactions lazily and commits around SAVEPOINTs on its
+    # own, so begin_nested() rows survive an outer rollback. Let SQLAlchemy
+    # emit BEGIN itself (the documented workaround). Explicit transactions
+    # also cover reads, so the database runs in WAL mode, where readers do not
+    # block a writer's commit; sessions still end their transaction before
+    # network I/O, because writers do block each other.
+    _SQLITE_FILE = engine.url.database not in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_no_autobegin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        if _SQLITE_FILE:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
 SessionLocal = sessionmaker(
     bind=engine,
     autoflush=False,
@@ -36,3 +59,43 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _add_missing_columns() -> None:
+    """Add model columns that existing tables lack.
+
+    `create_all` only creates missing tables, so a database from an older
+    version would fail on every query touching a new column. Columns are
+    added with their scalar default, which fills the existing rows.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = [column for column in table.columns if column.name not in existing]
+            for column in added:
+                ddl = str(CreateColumn(column).compile(dialect=engine.dialect))
+                default = column.default
+                if column.server_default is None and default is not None and default.is_scalar:
+                    value = literal(default.arg, column.type).compile(
+                        dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                    ddl += f" DEFAULT {value}"
+                elif not column.nullable and column.server_default is None:
+                    # the existing rows would violate NOT NULL; add it as nullable
+                    ddl = ddl.replace(" NOT NULL", "")
+                conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}")
+                logging.warning("Added column %s.%s", table.name, column.name)
+
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def init_db() -> None:
+    """Create missing tables and columns. Called once on API and worker startup."""
+    import app.models  # noqa: F401  registers the models on Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
@@ -0,0 +1,86 @@
+"""One long-lived asyncio event loop per process, for sync Celery tasks.
+
+`asyncio.run` creates and closes a loop on every call, so async clients
+(Telethon, httpx) bound to the previous loop can not be reused. Instead the
+loop runs forever in a daemon thread and sync code submits coroutines to it
+with `run_sync`. Clients that live on the loop register a cleanup coroutine
+with `on_shutdown`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_pid: int | None = None
+_lock = threading.Lock()
+_shutdown_hooks: list[Callable[[], Awaitable[Any]]] = []
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the process event loop, starting its thread on first use.
+
+    The loop is recreated after a fork, since threads do not survive it.
+    """
+    global _loop, _thread, _pid
+    with _lock:
+        if _loop is None or _pid != os.getpid() or not _loop.is_running():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=run, name="aibot-event-loop", daemon=True)
+            _thread.start()
+            ready.wait()
+            _loop, _pid = loop, os.getpid()
+            log.info("Event loop started in pid %s", _pid)
+    return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run a coroutine on the process loop and wait for its result."""
+    loop = get_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run_sync() called from the event loop thread")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def on_shutdown(hook: Callable[[], Awaitable[Any]]) -> None:
+    """Register a coroutine function to run on the loop before it stops."""
+    if hook not in _shutdown_hooks:
+        _shutdown_hooks.append(hook)
+
+
+def shutdown(timeout: float = 10.0) -> None:
+    """Run shutdown hooks, then stop the loop and join its thread."""
+    global _loop, _thread
+    if _loop is None or _pid != os.getpid() or not _loop.is_running():
+        return
+
+    async def close_all():
+        for hook in _shutdown_hooks:
+            try:
+                await hook()
+            except Exception:
+                log.exception("Event loop shutdown hook failed")
+
+    try:
+        run_sync(close_all(), timeout)
+    finally:
+        _loop.call_soon_threadsafe(_loop.stop)
+        _thread.join(timeout)
+        _loop.close()
+        _loop = _thread = None
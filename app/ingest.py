@@ -0,0 +1,73 @@
+"""Storing collected news items and their draft posts.
+
+Shared by the Celery collection tasks and the Telegram listener, so it
+does not import Celery.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.bloom import find_existing, remember
+from app.config import settings
+from app.logging_config import SAMPLED
+from app.models import Keyword, NewsItem, Post, PostStatus, Source
+
+log = logging.getLogger(__name__)
+
+
+def _passes_keyword_filter(db: Session, text: str) -> bool:
+    """Return True if the text matches at least one configured keyword."""
+    keywords = db.execute(select(Keyword)).scalars().all()
+    if not keywords:
+        return True
+    low = text.lower()
+    return any(k.word.lower() in low for k in keywords)
+
+
+def store_items(db: Session, src: Source, items: list[dict]) -> tuple[list[int], int]:
+    """Save new items that pass the keyword filter and create draft posts.
+
+    Returns the ids of the stored news and the number of unseen items before
+    the keyword filter (the source's activity, for its polling interval).
+    """
+    created_news_ids: list[int] = []
+    created_fingerprints: list[str] = []
+    existing = find_existing(db, [it["fingerprint"] for it in items])
+    items = [it for it in items if it["fingerprint"] not in existing]
+
+    accepted = []
+    for it in items:
+        full_text = f"{it.get('title', '')}\n{it.get('summary', '')}\n{it.get('raw_text', '') or ''}"
+
+        log.info("Collected news: %s", it.get("title", ""), extra=SAMPLED)
+        if not _passes_keyword_filter(db, full_text):
+            log.info("Keyword filter rejected news for source=%s", src.name, extra=SAMPLED)
+            continue
+        accepted.append(it)
+
+    # only pages of accepted items are downloaded, with no transaction open
+    if accepted and src.type.value == "site" and settings.ARTICLE_FETCH_ENABLED:
+        from app.news_parser.articles import enrich_items
+        db.commit()
+        enrich_items(accepted)
+
+    for it in accepted:
+        news = NewsItem(**it)
+        try:
+            with db.begin_nested():
+                db.add(news)
+        except IntegrityError:
+            continue
+
+        created_news_ids.append(news.id)
+        created_fingerprints.append(news.fingerprint)
+        post = Post(news_id=news.id, status=PostStatus.new)
+        db.add(post)
+
+    remember(created_fingerprints)
+    return created_news_ids, len(items)
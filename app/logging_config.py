@@ -1,16 +1,116 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+import queue
+import threading
+import time
+
 from app.config import settings, BASE_DIR
 
 DEFAULT_LOG_FOLDER = BASE_DIR / 'logs'
-LOG_FOLDER = settings.LOG_FOLDER or DEFAULT_LOG_FOLDER
+LOG_FOLDER = Path(settings.LOG_FOLDER) if settings.LOG_FOLDER else DEFAULT_LOG_FOLDER
 LOG_FILE = LOG_FOLDER / 'aibot.log'
 
-def setup_logging():
+# pass as `extra=` on per-item log calls in hot loops
+SAMPLED = {"sampled": True}
+
+
+class SamplingFilter(logging.Filter):
+    """Rate-limit records logged with `extra=SAMPLED`.
+
+    At most LOG_SAMPLE_PER_SECOND records per call site (logger + message
+    template) pass each second; the next one that passes reports how many
+    were dropped. Records without the flag are never touched.
+    """
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self._windows: dict[tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.per_second <= 0:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.setdefault(key, [now, 0, 0])  # start, passed, dropped
+            if now - window[0] >= 1.0:
+                window[0], window[1] = now, 0
+            if window[1] >= self.per_second:
+                window[2] += 1
+                return False
+            window[1] += 1
+            dropped, window[2] = window[2], 0
+
+        if dropped:
+            record.msg = f"{record.msg} (+{dropped} similar suppressed)"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class _LocalQueueHandler(QueueHandler):
+    """QueueHandler for an in-process queue.
+
+    The stock `prepare` formats the record in the calling thread so it can be
+    pickled; records here never leave the process, so formatting is left to
+    the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_queue_handler: _LocalQueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+def _start_listener(*handlers: logging.Handler) -> queue.SimpleQueue:
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return log_queue
+
+
+def restart_listener() -> None:
+    """Start a new listener thread in a forked child (threads do not survive fork)."""
+    if _queue_handler is not None and _listener is not None:
+        _queue_handler.queue = _start_listener(*_listener.handlers)
+
+
+def stop_listener() -> None:
+    """Write out queued records; call before the process exits."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def setup_logging(**kwargs):
+    """Configure the root logger; also connected to Celery's setup_logging signal."""
+    global _queue_handler
     root = logging.getLogger()
     if root.handlers:
         return
 
+    LOG_FOLDER.mkdir(parents=True, exist_ok=True)
     handler = RotatingFileHandler(
         LOG_FILE,
         maxBytes=10 * 1024 * 1024,  # 10 MB
@@ -18,13 +118,23 @@ def setup_logging():
         encoding="utf-8"
     )
 
-    formatter = logging.Formatter(
-        "[%(asctime)s] %(levelname)s %(name)s: %(message)s",
-        "%Y-%m-%d %H:%M:%S"
-    )
+    if settings.LOG_JSON:
+        formatter = JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S")
+    else:
+        formatter = logging.Formatter(
+            "[%(asctime)s] %(levelname)s %(name)s: %(message)s",
+            "%Y-%m-%d %H:%M:%S"
+        )
 
     handler.setFormatter(formatter)
 
+    if settings.LOG_ASYNC:
+        # file I/O and formatting move to the listener's background thread
+        handler = _queue_handler = _LocalQueueHandler(_start_listener(handler))
+        atexit.register(stop_listener)
+
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_PER_SECOND))
+
     root = logging.getLogger()
     root.setLevel(settings.LOG_LEVEL)
-    root.addHandler(handler)
\ No newline at end of file
+    root.addHandler(handler)
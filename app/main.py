@@ -1,11 +1,23 @@
 import logging
+from contextlib import asynccontextmanager
+import uuid
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
 
 from app.api.endpoints import router as api_router
 from app.config import settings
-from app.database import Base, engine
+from app.database import init_db
 from app.logging_config import setup_logging
+from app import profiling
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup steps once the server starts, not on import."""
+    # MVP: автосоздание таблиц (позже можно Alembic)
+    init_db()
+    yield
 
 
 def create_app() -> FastAPI:
@@ -13,14 +25,39 @@ def create_app() -> FastAPI:
     setup_logging()
     log = logging.getLogger(__name__)
 
-    app = FastAPI(title=settings.APP_NAME)
+    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
     log.info("Application created")
 
-    # MVP: автосоздание таблиц (позже можно Alembic)
-    Base.metadata.create_all(bind=engine)
-
     app.include_router(api_router, prefix=settings.API_PREFIX)
+
+    if settings.PROFILE_REQUESTS_ENABLED:
+        app.middleware("http")(profile_request)
     return app
 
 
+async def profile_request(request: Request, call_next):
+    """Profile requests sent with an `X-Profile: 1` header.
+
+    Only the thread running this request's endpoint is sampled, so concurrent
+    requests to other endpoints stay out of the profile. The profile id comes
+    back in the `X-Profile-Id` response header and the profile is served by
+    GET /profiles/{id}.
+    """
+    if request.headers.get("x-profile") not in ("1", "true"):
+        return await call_next(request)
+
+    profile_id = f"request-{uuid.uuid4().hex}"
+    # routing puts the endpoint into the scope once the request is matched
+    scope = request.scope
+    profiler = profiling.start_profiler(profiling.threads_running(
+        lambda: getattr(scope.get("endpoint"), "__code__", None)))
+    try:
+        response = await call_next(request)
+    finally:
+        # joins the sampler and writes to Redis: keep it off the event loop
+        await run_in_threadpool(profiling.finish_profiler, profile_id, profiler)
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
 app = create_app()
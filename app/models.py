@@ -1,10 +1,13 @@
 import enum
 from datetime import datetime
 from sqlalchemy import (
-    String, DateTime, Boolean, Enum, Text, ForeignKey, UniqueConstraint
+    String, DateTime, Boolean, Enum, Text, ForeignKey, UniqueConstraint, Integer, Float,
+    LargeBinary, JSON, event, select
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from app.config import settings
 from app.database import Base
+from app.storage import HexDigest, compress_text, decompress_text, text_digest
 
 
 class SourceType(str, enum.Enum):
@@ -17,6 +20,14 @@ class PostStatus(str, enum.Enum):
     generated = "generated"
     published = "published"
     failed = "failed"
+    expired = "expired"
+    merged = "merged"
+
+
+class DeliveryStatus(str, enum.Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
 
 
 class Source(Base):
@@ -27,6 +38,15 @@ class Source(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     url: Mapped[str] = mapped_column(String(1024), nullable=False)  # site url or tg username/link
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    weight: Mapped[float] = mapped_column(Float, default=1.0)  # relevance multiplier, see app.scoring
+
+    # adaptive polling state, see app.scheduler
+    poll_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    next_poll_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    last_polled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    item_rate: Mapped[float] = mapped_column(Float, default=0.0)  # new items per second (EWMA)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -36,6 +56,21 @@ class Keyword(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     word: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
+    weight: Mapped[float] = mapped_column(Float, default=1.0)
+
+
+class TextBlob(Base):
+    """Compressed text addressed by its SHA-256, shared between rows and columns."""
+
+    __tablename__ = "text_blobs"
+
+    hash: Mapped[bytes] = mapped_column(LargeBinary(32), primary_key=True)
+    codec: Mapped[str] = mapped_column(String(8), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    @property
+    def text(self) -> str:
+        return decompress_text(self.codec, self.data)
 
 
 class NewsItem(Base):
@@ -45,14 +80,19 @@ class NewsItem(Base):
 
     title: Mapped[str] = mapped_column(String(512), nullable=False)
     url: Mapped[str | None] = mapped_column(String(1024), nullable=True)
-    summary: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # summary/raw_text are kept inline, or in text_blobs in compact storage mode;
+    # use the `summary` and `raw_text` properties, not the columns
+    _summary: Mapped[str | None] = mapped_column("summary", Text, nullable=True)
+    summary_hash: Mapped[bytes | None] = mapped_column(LargeBinary(32), ForeignKey("text_blobs.hash"), nullable=True)
 
     source: Mapped[str] = mapped_column(String(255), nullable=False)
     published_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
-    raw_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    _raw_text: Mapped[str | None] = mapped_column("raw_text", Text, nullable=True)
+    raw_text_hash: Mapped[bytes | None] = mapped_column(LargeBinary(32), ForeignKey("text_blobs.hash"), nullable=True)
 
-    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256
+    fingerprint: Mapped[str] = mapped_column(HexDigest, nullable=False)  # sha256
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     __table_args__ = (
@@ -61,6 +101,69 @@ class NewsItem(Base):
 
     posts: Mapped[list["Post"]] = relationship("Post", back_populates="news")
 
+    summary_blob: Mapped[TextBlob | None] = relationship(
+        TextBlob, foreign_keys=[summary_hash], lazy="selectin", viewonly=True,
+    )
+    raw_text_blob: Mapped[TextBlob | None] = relationship(
+        TextBlob, foreign_keys=[raw_text_hash], lazy="selectin", viewonly=True,
+    )
+
+    def _get_text(self, name: str) -> str | None:
+        value = getattr(self, f"_{name}")
+        if value is not None:
+            return value
+
+        digest = getattr(self, f"{name}_hash")
+        if digest is None:
+            return None
+
+        pending = self.__dict__.get("_pending_texts")
+        if pending and digest in pending:
+            return pending[digest]
+
+        blob = getattr(self, f"{name}_blob")
+        return blob.text if blob is not None else None
+
+    def _set_text(self, name: str, value: str | None) -> None:
+        if (
+            value is None
+            or not settings.COMPACT_STORAGE
+            or len(value) < settings.COMPACT_TEXT_MIN_CHARS
+        ):
+            setattr(self, f"_{name}", value)
+            setattr(self, f"{name}_hash", None)
+            return
+
+        digest = text_digest(value)
+        setattr(self, f"_{name}", None)
+        setattr(self, f"{name}_hash", digest)
+        self.__dict__.setdefault("_pending_texts", {})[digest] = value
+
+    @property
+    def summary(self) -> str:
+        return self._get_text("summary")
+
+    @summary.setter
+    def summary(self, value: str) -> None:
+        self._set_text("summary", value)
+
+    @property
+    def raw_text(self) -> str | None:
+        return self._get_text("raw_text")
+
+    @raw_text.setter
+    def raw_text(self, value: str | None) -> None:
+        self._set_text("raw_text", value)
+
+
+class NewsTombstone(Base):
+    """Fingerprint of an archived news item, kept so it is not collected again."""
+
+    __tablename__ = "news_tombstones"
+
+    fingerprint: Mapped[str] = mapped_column(HexDigest, primary_key=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
 
 class Post(Base):
     __tablename__ = "posts"
@@ -75,9 +178,94 @@ class Post(Base):
     generated_text: Mapped[str | None] = mapped_column(Text, nullable=True)
     published_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
-    status: Mapped[PostStatus] = mapped_column(Enum(PostStatus), default=PostStatus.new, nullable=False)
+    status: Mapped[PostStatus] = mapped_column(Enum(PostStatus), default=PostStatus.new, nullable=False, index=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    generated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+
+    # set for `merged` posts: the post that covers the same story, see app.clustering
+    merged_into_id: Mapped[int | None] = mapped_column(ForeignKey("posts.id"), nullable=True, index=True)
+
+    # failed attempts so far and when the next one is due; None = not retried
+    retry_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_retry_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     news: Mapped["NewsItem"] = relationship("NewsItem", back_populates="posts")
+    merged: Mapped[list["Post"]] = relationship("Post", back_populates="merged_into")
+    merged_into: Mapped["Post | None"] = relationship("Post", back_populates="merged", remote_side=[id])
+    deliveries: Mapped[list["Delivery"]] = relationship("Delivery", back_populates="post")
+
+
+class Channel(Base):
+    """A Telegram channel posts are published to, see app.publishing.
+
+    A post goes to every enabled channel whose rules it matches: empty
+    `keywords` / `sources` lists match everything.
+    """
+    __tablename__ = "channels"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    chat: Mapped[str | None] = mapped_column(String(255), nullable=True)  # @username or id; empty = DRYRUN
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    keywords: Mapped[list[str]] = mapped_column(JSON, default=list)
+    sources: Mapped[list[str]] = mapped_column(JSON, default=list)  # Source.name values
+
+    # send budget: at most rate_per_hour posts, at least min_interval_seconds apart
+    rate_per_hour: Mapped[int] = mapped_column(Integer, default=lambda: settings.CHANNEL_RATE_PER_HOUR)
+    min_interval_seconds: Mapped[int] = mapped_column(Integer, default=lambda: settings.CHANNEL_MIN_INTERVAL_SECONDS)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    deliveries: Mapped[list["Delivery"]] = relationship("Delivery", back_populates="channel")
+
+
+class Delivery(Base):
+    """Publication of one post to one channel."""
+    __tablename__ = "deliveries"
+    __table_args__ = (UniqueConstraint("post_id", "channel_id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    post_id: Mapped[int] = mapped_column(ForeignKey("posts.id"), nullable=False, index=True)
+    channel_id: Mapped[int] = mapped_column(ForeignKey("channels.id"), nullable=False)
+
+    status: Mapped[DeliveryStatus] = mapped_column(Enum(DeliveryStatus), default=DeliveryStatus.pending, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    retry_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_retry_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    post: Mapped["Post"] = relationship("Post", back_populates="deliveries")
+    channel: Mapped["Channel"] = relationship("Channel", back_populates="deliveries")
+
+
+@event.listens_for(Session, "before_flush")
+def _store_text_blobs(session, flush_context, instances):
+    """Insert text blobs referenced by new or changed news items, once per hash."""
+    pending: dict[bytes, str] = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, NewsItem):
+            pending.update(obj.__dict__.get("_pending_texts") or {})
+    if not pending:
+        return
+
+    with session.no_autoflush:
+        existing = set(
+            session.execute(select(TextBlob.hash).where(TextBlob.hash.in_(list(pending))))
+            .scalars()
+            .all())
+        existing.update(
+            obj.hash for obj in session.new if isinstance(obj, TextBlob)
+        )
+
+    for digest, text in pending.items():
+        if digest in existing:
+            continue
+        codec, data = compress_text(text)
+        session.add(TextBlob(hash=digest, codec=codec, data=data))
@@ -0,0 +1,233 @@
+"""Concurrent fetching of site pages: news lists and full article bodies."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+import logging
+from typing import Callable
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.config import settings
+from app.event_loop import on_shutdown, run_sync
+from app.resilience import CircuitOpenError, get_breaker
+
+BODY_SELECTORS = (
+    'div.tm-article-body',  # habr
+    'article',
+    'main',
+)
+NOISE_TAGS = ('script', 'style', 'noscript', 'nav', 'aside', 'header', 'footer', 'form', 'figure')
+
+DEFAULT_HEADERS = {
+    'User-Agent': "Mozilla/5.0",
+    'Accept': 'text/html',
+}
+
+logger = logging.getLogger(__name__)
+
+# pooled client living on the process event loop, reused across tasks
+_client: httpx.AsyncClient | None = None
+# per-host limiters of the pooled client, shared by list and article fetches
+_limiters: dict[str, _HostLimiter] = {}
+
+
+class _HostLimiter:
+    """Concurrency cap plus a minimum delay between request starts for one host."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._delay = delay
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            start = max(now, self._next_start)
+            self._next_start = start + self._delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+def _client_options() -> dict:
+    return {
+        'headers': DEFAULT_HEADERS,
+        'timeout': settings.ARTICLE_TIMEOUT_SECONDS,
+        'follow_redirects': True,
+    }
+
+
+def _new_limiter() -> _HostLimiter:
+    return _HostLimiter(settings.ARTICLE_MAX_PER_HOST, settings.ARTICLE_HOST_DELAY_SECONDS)
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(**_client_options())
+        _limiters.clear()
+        on_shutdown(close_client)
+    return _client
+
+
+def _get_limiter(url: str) -> _HostLimiter:
+    host = urlsplit(url).netloc
+    if host not in _limiters:
+        _limiters[host] = _new_limiter()
+    return _limiters[host]
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def extract_text(html: str) -> str:
+    """Return readable article text from an HTML page."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all(NOISE_TAGS):
+        tag.decompose()
+
+    body = None
+    for selector in BODY_SELECTORS:
+        body = soup.select_one(selector)
+        if body is not None:
+            break
+    if body is None:
+        body = soup.body or soup
+
+    lines = (line.strip() for line in body.get_text('\n').splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+async def _fetch_html(client: httpx.AsyncClient, limiter: _HostLimiter, url: str) -> str | None:
+    """Download a page under its host limiter and circuit breaker."""
+    breaker = get_breaker(f"site:{urlsplit(url).netloc}")
+    async with limiter:
+        try:
+            with breaker.guard():
+                return await _download(client, url)
+        except CircuitOpenError as exc:
+            logger.info("Page fetch skipped: %s", exc)
+            return None
+        except httpx.HTTPError as exc:
+            logger.warning("Page fetch failed for %s: %s", url, exc)
+            return None
+
+
+def fetch_page(url: str) -> str | None:
+    """Return the HTML of a site page, e.g. a news list, or None on failure.
+
+    Sync wrapper for parsers; uses the pooled client and shares the host's
+    limiter and circuit breaker with article fetches.
+    """
+    return run_sync(_fetch_html(_get_client(), _get_limiter(url), url))
+
+
+async def _fetch_one(client: httpx.AsyncClient, limiter: _HostLimiter, url: str) -> str | None:
+    html = await _fetch_html(client, limiter, url)
+    if html is None:
+        return None
+    # parsing is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(extract_text, html)
+
+
+async def _download(client: httpx.AsyncClient, url: str) -> str | None:
+    """Return the page HTML, or None if it is not a usable article page.
+
+    Server errors raise, so they count against the host circuit breaker.
+    """
+    async with client.stream('GET', url) as response:
+        if response.status_code >= 500:
+            response.raise_for_status()
+        if response.status_code != 200:
+            logger.warning("Page fetch returned %s for %s", response.status_code, url)
+            return None
+
+        declared = response.headers.get('content-length')
+        if declared and declared.isdigit() and int(declared) > settings.ARTICLE_MAX_BYTES:
+            logger.warning("Article too large (%s bytes): %s", declared, url)
+            return None
+
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > settings.ARTICLE_MAX_BYTES:
+                logger.warning("Article exceeded %s bytes: %s", settings.ARTICLE_MAX_BYTES, url)
+                return None
+            chunks.append(chunk)
+
+        return b''.join(chunks).decode(response.encoding or 'utf-8', errors='replace')
+
+
+async def fetch_article_texts(
+    urls: list[str],
+    *,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> dict[str, str]:
+    """Fetch and extract article texts, keyed by URL.
+
+    All requests share one pooled client; each host gets at most
+    ARTICLE_MAX_PER_HOST concurrent requests spaced by ARTICLE_HOST_DELAY_SECONDS.
+    Failed or oversized pages are left out of the result. A custom `transport`
+    (e.g. recorded fixtures) gets its own short-lived client.
+    """
+    if transport is not None:
+        async with httpx.AsyncClient(transport=transport, **_client_options()) as client:
+            limiters: dict[str, _HostLimiter] = defaultdict(_new_limiter)
+            return await _fetch_all(client, urls, lambda url: limiters[urlsplit(url).netloc])
+    client = _get_client()
+    return await _fetch_all(client, urls, _get_limiter)
+
+
+async def _fetch_all(
+    client: httpx.AsyncClient,
+    urls: list[str],
+    limiter_for: Callable[[str], _HostLimiter],
+) -> dict[str, str]:
+    unique_urls = list(dict.fromkeys(urls))
+
+    # one broken page must not cost the rest of the batch
+    results = await asyncio.gather(
+        *(_fetch_one(client, limiter_for(url), url) for url in unique_urls),
+        return_exceptions=True,
+    )
+
+    texts: dict[str, str] = {}
+    for url, result in zip(unique_urls, results):
+        if isinstance(result, Exception):
+            logger.error("Article fetch crashed for %s", url, exc_info=result)
+        elif result:
+            texts[url] = result
+    return texts
+
+
+def enrich_items(items: list[dict]) -> int:
+    """Fill `raw_text` of items that have a URL but no body yet.
+
+    Sync wrapper for Celery. Returns the number of enriched items.
+    """
+    pending = [it for it in items if it.get('url') and not it.get('raw_text')]
+    if not pending:
+        return 0
+
+    texts = run_sync(fetch_article_texts([it['url'] for it in pending]))
+    for it in pending:
+        text = texts.get(it['url'])
+        if text:
+            it['raw_text'] = text[:settings.ARTICLE_MAX_TEXT_CHARS]
+
+    logger.info("Fetched %s of %s article bodies", len(texts), len(pending))
+    return sum(1 for it in pending if it.get('raw_text'))
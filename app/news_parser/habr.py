@@ -2,10 +2,10 @@
 
 import logging
 
-import requests
 from bs4 import BeautifulSoup
 
-from app.news_parser.http_client import get
+from app.logging_config import SAMPLED
+from app.news_parser.articles import fetch_page
 from app.news_parser.utils import get_full_url, parse_date
 from app.utils import sha256_hex
 
@@ -17,11 +17,6 @@ CARD_SELECTOR = 'article.tm-articles-list__item'
 TITLE_SELECTOR = 'a'
 TITLE_LINK_SELECTOR = 'tm-title__link'
 
-DEFAULT_HEADERS = {
-    'User-Agent': "Mozilla/5.0",
-    'Accept': 'text/html',
-}
-
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +34,7 @@ def parser_list_html(html: str) -> list[dict]:
         if link is None:
             continue
 
-        logger.info(link)
+        logger.info("Found link: %s", link, extra=SAMPLED)
 
         published_at = parse_date(article_tag.find("time").get('datetime', ''))
         text_row = article_tag.find("p")
@@ -64,20 +59,15 @@ def parser_list_html(html: str) -> list[dict]:
 
 
 def fetch_news_list() -> list[dict[str, str]]:
-    """Fetch the Habr news list and parse it."""
-    raw_items: list[dict[str, str]] = []
-    try:
-        response = get(url=NEWS_URL, headers=DEFAULT_HEADERS)
-    except requests.RequestException as exc:
-        logger.warning("При парсинге возникла ошибка %s", exc)
-        return raw_items
-
-    if response.status_code != 200:
-        logger.warning("При парсинге возник статус код %s", response.status_code)
-        return raw_items
-
-    raw_items = parser_list_html(response.text)
-    return raw_items
+    """Fetch the Habr news list and parse it.
+
+    The list page goes through the same host limiter and circuit breaker as
+    article pages; failures are logged by `fetch_page`.
+    """
+    html = fetch_page(NEWS_URL)
+    if html is None:
+        return []
+    return parser_list_html(html)
 
 
 if __name__ == '__main__':
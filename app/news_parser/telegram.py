@@ -12,11 +12,16 @@ from telethon.tl.types import Message
 
 from app.config import settings
 from app.database import SessionLocal
+from app.event_loop import on_shutdown, run_sync
 from app.models import Source
 from app.utils import sha256_hex
 
 log = logging.getLogger(__name__)
 
+# user-session client shared by all parse calls in this process
+_reader: TelegramClient | None = None
+_reader_lock = asyncio.Lock()
+
 
 def parse_tg_source(source: Source) -> list[dict]:
     """Sync wrapper for Celery to parse a Telegram source."""
@@ -26,54 +31,85 @@ def parse_tg_source(source: Source) -> list[dict]:
     if not settings.TG_API_ID or not settings.TG_API_HASH:
         log.warning("Telegram credentials are not set; skipping source=%s", source.name)
         return []
-    return asyncio.run(_parse_tg_async(source))
+    return run_sync(parse_tg_async(source))
+
+
+async def get_reader_client() -> TelegramClient:
+    """Return the connected user-session client, creating it on first use."""
+    global _reader
+    async with _reader_lock:
+        if _reader is None:
+            _reader = TelegramClient(settings.TG_SESSION, settings.TG_API_ID, settings.TG_API_HASH)
+            await _reader.start()
+            on_shutdown(disconnect_reader)
+        elif not _reader.is_connected():
+            await _reader.connect()
+    return _reader
+
 
+async def disconnect_reader() -> None:
+    global _reader
+    if _reader is not None:
+        await _reader.disconnect()
+        _reader = None
 
-async def _parse_tg_async(source: Source) -> list[dict]:
-    """Collect messages from a Telegram source asynchronously."""
+
+async def parse_tg_async(source: Source, client: TelegramClient | None = None) -> list[dict]:
+    """Collect the latest messages of a Telegram source.
+
+    Uses the shared reader client unless another connected `client` is given
+    (e.g. the listener's).
+    """
     items: list[dict] = []
 
-    async with TelegramClient(settings.TG_SESSION, settings.TG_API_ID, settings.TG_API_HASH) as client:
-        entity = source.url  # username like @channel or link
-        async for msg in client.iter_messages(entity, limit=30):
-            if not isinstance(msg, Message):
-                continue
-            if not msg.message:
-                continue
-
-            text = msg.message.strip()
-            title = text.splitlines()[0][:140] if text else "(no title)"
-
-            published_at = datetime.now(tz=timezone.utc)
-            if msg.date:
-                dt = msg.date
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                published_at = dt.astimezone(timezone.utc)
-
-            # try build url if message has id and username
-            link = None
-            try:
-                if isinstance(entity, str) and entity.startswith("@"):
-                    link = f"https://t.me/{entity[1:]}/{msg.id}"
-            except Exception:
-                pass
-
-            fingerprint = sha256_hex(link or f"{source.name}|{msg.id}|{published_at.isoformat()}")
-
-            items.append({
-                "title": title[:512],
-                "url": (link[:1024] if link else None),
-                "summary": text[:5000],
-                "source": source.name,
-                "published_at": published_at.replace(tzinfo=None),
-                "raw_text": text[:10000],
-                "fingerprint": fingerprint,
-            })
+    client = client or await get_reader_client()
+    entity = source.url  # username like @channel or link
+    async for msg in client.iter_messages(entity, limit=30):
+        item = message_to_item(msg, source.name, entity)
+        if item is not None:
+            items.append(item)
 
     return items
 
 
+def message_to_item(msg: Message, source_name: str, entity: str) -> dict | None:
+    """Normalize a channel message into a NewsItem dict; None if it has no text."""
+    if not isinstance(msg, Message):
+        return None
+    if not msg.message:
+        return None
+
+    text = msg.message.strip()
+    title = text.splitlines()[0][:140] if text else "(no title)"
+
+    published_at = datetime.now(tz=timezone.utc)
+    if msg.date:
+        dt = msg.date
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        published_at = dt.astimezone(timezone.utc)
+
+    # try build url if message has id and username
+    link = None
+    try:
+        if isinstance(entity, str) and entity.startswith("@"):
+            link = f"https://t.me/{entity[1:]}/{msg.id}"
+    except Exception:
+        pass
+
+    fingerprint = sha256_hex(link or f"{source_name}|{msg.id}|{published_at.isoformat()}")
+
+    return {
+        "title": title[:512],
+        "url": (link[:1024] if link else None),
+        "summary": text[:5000],
+        "source": source_name,
+        "published_at": published_at.replace(tzinfo=None),
+        "raw_text": text[:10000],
+        "fingerprint": fingerprint,
+    }
+
+
 if __name__ == "__main__":
     db = SessionLocal()
     print("DB URL:", db.bind.url)
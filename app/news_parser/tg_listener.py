@@ -0,0 +1,218 @@
+"""Push-based ingestion of Telegram channel messages.
+
+A long-running process subscribes to `events.NewMessage` for every enabled
+`tg` source, normalizes messages like the poller does and stores them in
+micro-batches of TG_LISTENER_BATCH_SIZE items or TG_LISTENER_BATCH_MS
+milliseconds. The subscription set is reloaded when the set of enabled tg
+sources changes; it is re-read whenever the ``sources`` cache version moves
+(API writes and polling both bump it). After each (re)connect the
+channels are polled once to fill the gap; the scheduled polling keeps
+running as a fallback and backs off on its own while the listener delivers
+the news first.
+
+    python -m app.news_parser.tg_listener
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+import logging
+import time
+
+from sqlalchemy import select
+from telethon import TelegramClient, events
+from telethon.errors import FloodWaitError, RPCError
+from telethon.utils import get_peer_id
+
+from app.cache import bump_version, get_version
+from app.config import settings
+from app.database import SessionLocal, init_db
+from app.ingest import store_items
+from app.logging_config import setup_logging
+from app.models import Source, SourceType
+from app.news_parser.telegram import message_to_item, parse_tg_async
+
+log = logging.getLogger(__name__)
+
+# cap of the reconnect backoff, in multiples of TG_LISTENER_RECONNECT_SECONDS
+MAX_BACKOFF_STEPS = 6
+
+
+def _load_sources() -> list[Source]:
+    """Return enabled tg sources, detached but with their columns loaded."""
+    with SessionLocal(expire_on_commit=False) as db:
+        return (
+            db.execute(
+                select(Source)
+                .where(
+                    Source.enabled == True,
+                    Source.type == SourceType.tg,
+                )
+            )
+            .scalars()
+            .all())
+
+
+def _store_batch(batch: list[tuple[int, dict]]) -> int:
+    """Store queued items grouped by source. Returns the number of new news."""
+    by_source: dict[int, list[dict]] = defaultdict(list)
+    for source_id, item in batch:
+        by_source[source_id].append(item)
+
+    created = 0
+    with SessionLocal() as db:
+        for source_id, items in by_source.items():
+            src = db.get(Source, source_id)
+            if src is None or not src.enabled:
+                continue
+            created += len(store_items(db, src, items)[0])
+        db.commit()
+
+    if created:
+        bump_version("news", "posts")
+    return created
+
+
+class TelegramListener:
+    """Subscribe to enabled channels and feed new messages into the DB."""
+
+    def __init__(self, client: TelegramClient):
+        self.client = client
+        self.queue: asyncio.Queue[tuple[int, dict]] = asyncio.Queue()
+        # chat id -> source
+        self._channels: dict[int, Source] = {}
+        self._sources_version: int | None = None
+        self._sources_key: set[tuple[int, str]] = set()
+
+    async def reload(self, sources: list[Source] | None = None) -> None:
+        """Resolve enabled tg sources to chat ids and replace the subscription set."""
+        self._sources_version = await asyncio.to_thread(get_version, "sources")
+        if sources is None:
+            sources = await asyncio.to_thread(_load_sources)
+        self._sources_key = {(src.id, src.url) for src in sources}
+
+        channels: dict[int, Source] = {}
+        for src in sources:
+            try:
+                entity = await self.client.get_entity(src.url)
+            except (ValueError, TypeError) as e:
+                log.warning("Can not resolve Telegram source=%s (%s): %s", src.name, src.url, e)
+                continue
+            channels[get_peer_id(entity)] = src
+
+        self._channels = channels
+        log.info("Listening to %s Telegram channels", len(channels))
+
+    async def gap_fill(self) -> None:
+        """Poll every subscribed channel once, e.g. after a reconnect."""
+        for src in list(self._channels.values()):
+            try:
+                items = await parse_tg_async(src, self.client)
+            except Exception as e:
+                log.warning("Gap fill failed for source=%s: %s", src.name, e)
+                continue
+            for item in items:
+                self.queue.put_nowait((src.id, item))
+
+    async def on_message(self, event: events.NewMessage.Event) -> None:
+        src = self._channels.get(event.chat_id)
+        if src is None:
+            return
+        item = message_to_item(event.message, src.name, src.url)
+        if item is not None:
+            self.queue.put_nowait((src.id, item))
+
+    async def write_batches(self) -> None:
+        """Drain the queue in micro-batches and store them off the event loop."""
+        max_wait = settings.TG_LISTENER_BATCH_MS / 1000
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.monotonic() + max_wait
+            while len(batch) < settings.TG_LISTENER_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                created = await asyncio.to_thread(_store_batch, batch)
+                log.info("Stored %s of %s pushed Telegram messages", created, len(batch))
+            except Exception:
+                log.exception("Failed to store %s Telegram messages", len(batch))
+
+    async def watch_sources(self) -> None:
+        """Reload subscriptions when sources change through the API."""
+        while True:
+            await asyncio.sleep(settings.TG_LISTENER_RELOAD_SECONDS)
+            version = await asyncio.to_thread(get_version, "sources")
+            if version is None or version == self._sources_version:
+                continue
+            self._sources_version = version
+            # the version also moves on every poll; resolve entities only on real changes
+            sources = await asyncio.to_thread(_load_sources)
+            if {(src.id, src.url) for src in sources} != self._sources_key:
+                log.info("Sources changed, reloading Telegram subscriptions")
+                try:
+                    await self.reload(sources)
+                except RPCError as e:
+                    # retried on the next change check
+                    self._sources_version = None
+                    log.warning("Telegram subscriptions not reloaded: %s", e)
+
+    async def run(self) -> None:
+        self.client.add_event_handler(self.on_message, events.NewMessage())
+        writer = asyncio.create_task(self.write_batches())
+        watcher = asyncio.create_task(self.watch_sources())
+        failures = 0
+        try:
+            while True:
+                delay = settings.TG_LISTENER_RECONNECT_SECONDS
+                try:
+                    await self.client.start()
+                    await self.reload()
+                    await self.gap_fill()
+                    failures = 0
+                    await self.client.disconnected
+                except FloodWaitError as e:
+                    failures += 1
+                    delay = max(delay, e.seconds)
+                    log.warning("Telegram listener hit a flood wait: %s", e)
+                except (ConnectionError, OSError, RPCError) as e:
+                    failures += 1
+                    delay *= 2 ** min(failures - 1, MAX_BACKOFF_STEPS)
+                    log.warning("Telegram listener connection failed: %s", e)
+                log.warning("Telegram listener disconnected, reconnecting in %ss", delay)
+                await asyncio.sleep(delay)
+        finally:
+            watcher.cancel()
+            writer.cancel()
+            await self.client.disconnect()
+
+
+def main() -> None:
+    setup_logging()
+    if not settings.TG_API_ID or not settings.TG_API_HASH:
+        raise SystemExit("Telegram credentials are not set (TG_API_ID, TG_API_HASH)")
+
+    init_db()
+
+    if not settings.TG_LISTENER_SESSION or settings.TG_LISTENER_SESSION == settings.TG_SESSION:
+        raise SystemExit("TG_LISTENER_SESSION must be set and differ from TG_SESSION")
+
+    # Telethon's own reconnects would skip the gap fill: with auto_reconnect
+    # off every connection loss resolves `disconnected` and run() reconnects
+    client = TelegramClient(
+        settings.TG_LISTENER_SESSION,
+        settings.TG_API_ID,
+        settings.TG_API_HASH,
+        auto_reconnect=False,
+    )
+    asyncio.run(TelegramListener(client).run())
+
+
+if __name__ == "__main__":
+    main()
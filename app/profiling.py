@@ -0,0 +1,183 @@
+"""Opt-in sampling profiler for Celery tasks and API requests.
+
+A daemon thread snapshots the stacks of the profiled work's threads every
+PROFILE_INTERVAL_MS and counts identical stacks: a task's own thread and
+its helper threads (event loop, StatusWriter calls), or the thread running
+a request's endpoint. The result is stored in Redis for PROFILE_TTL_SECONDS
+in the collapsed-stack format read by flamegraph.pl and speedscope, keyed
+by the Celery task id or a generated request id.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import sys
+import threading
+from types import CodeType, FrameType
+from typing import Callable, Iterator
+
+import redis
+
+from app.config import settings
+from app.redis_client import get_redis
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "aibot:profile"
+
+# deeper stacks are cut from the root side
+MAX_DEPTH = 128
+
+# threads that only run work for the task in progress (prefork runs one task per process)
+TASK_HELPER_THREADS = ("aibot-event-loop", "aibot-status-call")
+
+# decides from (thread id, thread name, current frame) whether a thread is sampled
+ThreadSelector = Callable[[int, str, FrameType], bool]
+
+
+def task_threads(thread_id: int) -> ThreadSelector:
+    """Select the task's own thread and its helper threads."""
+    def select(ident: int, name: str, frame: FrameType) -> bool:
+        return ident == thread_id or name.startswith(TASK_HELPER_THREADS)
+    return select
+
+
+def threads_running(code: Callable[[], CodeType | None]) -> ThreadSelector:
+    """Select threads whose stack is inside the code object `code()` returns."""
+    def select(ident: int, name: str, frame: FrameType) -> bool:
+        target = code()
+        while target is not None and frame is not None:
+            if frame.f_code is target:
+                return True
+            frame = frame.f_back
+        return False
+    return select
+
+
+class SamplingProfiler:
+    """Periodic stack sampler; start() and stop() from the profiled code."""
+
+    def __init__(self, interval: float, select: ThreadSelector):
+        self.interval = interval
+        self.select = select
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="aibot-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                name = names.get(thread_id, str(thread_id))
+                if thread_id == own_id or not self.select(thread_id, name, frame):
+                    continue
+                self.stacks[self._collapse(name, frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        frames: list[str] = []
+        while frame is not None and len(frames) < MAX_DEPTH:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        # collapsed format uses ';' as the separator
+        return ";".join(f.replace(";", ":") for f in reversed(frames))
+
+
+def _key(profile_id: str) -> str:
+    return f"{KEY_PREFIX}:{profile_id}"
+
+
+def collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def save_profile(profile_id: str, stacks: Counter[str]) -> None:
+    try:
+        get_redis().set(_key(profile_id), collapsed(stacks), ex=settings.PROFILE_TTL_SECONDS)
+    except redis.RedisError as e:
+        log.warning("Profile %s not saved: %s", profile_id, e)
+
+
+def load_profile(profile_id: str) -> str | None:
+    """Return the collapsed stacks of a stored profile, or None."""
+    data = get_redis().get(_key(profile_id))
+    return data.decode() if isinstance(data, bytes) else data
+
+
+def start_profiler(select: ThreadSelector) -> SamplingProfiler:
+    profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000, select)
+    profiler.start()
+    return profiler
+
+
+def finish_profiler(profile_id: str, profiler: SamplingProfiler) -> None:
+    """Stop the profiler and store what it sampled under `profile_id`.
+
+    Blocks on the sampler thread and Redis: call it off the event loop.
+    """
+    save_profile(profile_id, profiler.stop())
+    log.info("Profile %s saved: %s samples", profile_id, profiler.samples)
+
+
+@contextmanager
+def profiled(profile_id: str) -> Iterator[SamplingProfiler]:
+    """Sample the calling thread and its helpers while the block runs and store the result."""
+    profiler = start_profiler(task_threads(threading.get_ident()))
+    try:
+        yield profiler
+    finally:
+        finish_profiler(profile_id, profiler)
+
+
+def to_speedscope(text: str, name: str) -> dict:
+    """Convert collapsed stacks into a speedscope "sampled" profile."""
+    frames: list[dict] = []
+    frame_index: dict[str, int] = {}
+    samples: list[list[int]] = []
+    weights: list[int] = []
+
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        sample = []
+        for frame in stack.split(";"):
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame})
+            sample.append(frame_index[frame])
+        samples.append(sample)
+        weights.append(int(count))
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "none",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": name,
+        "exporter": "aibot",
+    }
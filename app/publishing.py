@@ -0,0 +1,179 @@
+"""Fan-out of generated posts to publication channels.
+
+Each generated post gets one `Delivery` per enabled channel whose keyword
+and source rules it matches, so a single collection and generation pass
+feeds every channel. Deliveries are then sent per channel, in order, within
+the channel's send budget (see `SendBudget`). A post becomes `published`
+once all its deliveries are sent and `failed` if one of them fails for good.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+import logging
+
+from sqlalchemy import exists, func, insert, select, update
+from sqlalchemy.orm import Session, contains_eager
+
+from app.config import settings
+from app.models import Channel, Delivery, DeliveryStatus, NewsItem, Post, PostStatus
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "default"
+
+
+def ensure_default_channel(db: Session) -> None:
+    """Create the `default` channel from TG_TARGET_CHANNEL if there are no channels.
+
+    This keeps single-channel setups working without any configuration.
+    """
+    if db.execute(select(Channel.id).limit(1)).first() is None:
+        db.add(Channel(name=DEFAULT_CHANNEL, chat=settings.TG_TARGET_CHANNEL or None))
+        db.flush()
+        log.info("Created the default channel for %s", settings.TG_TARGET_CHANNEL or "DRYRUN")
+
+
+def channel_matches(channel: Channel, news: NewsItem) -> bool:
+    """Return True if the news passes the channel's source and keyword rules."""
+    if channel.sources and news.source.lower() not in {s.lower() for s in channel.sources}:
+        return False
+    if channel.keywords:
+        text = f"{news.title}\n{news.summary}".lower()
+        return any(word.lower() in text for word in channel.keywords)
+    return True
+
+
+def fan_out(db: Session) -> dict[int, int]:
+    """Create deliveries for generated posts that have none yet.
+
+    Posts that match no channel are marked `expired`. Returns the number of
+    new deliveries per channel id. The caller commits.
+    """
+    ensure_default_channel(db)
+    channels = db.execute(select(Channel).where(Channel.enabled == True)).scalars().all()
+    posts = (
+        db.execute(
+            select(Post)
+            .join(Post.news)
+            .options(contains_eager(Post.news))
+            .where(
+                Post.status == PostStatus.generated,
+                ~exists().where(Delivery.post_id == Post.id),
+            )
+            .order_by(Post.id)
+        )
+        .scalars()
+        .all())
+
+    rows = []
+    unrouted = []
+    for post in posts:
+        targets = [channel.id for channel in channels if channel_matches(channel, post.news)]
+        if not targets:
+            unrouted.append(post.id)
+        rows.extend({"post_id": post.id, "channel_id": channel_id} for channel_id in targets)
+
+    if rows:
+        db.execute(insert(Delivery), rows)
+    if unrouted:
+        db.execute(
+            update(Post)
+            .where(Post.id.in_(unrouted))
+            .values(status=PostStatus.expired, error="No matching channel")
+            .execution_options(synchronize_session=False)
+        )
+        log.info("%s posts match no channel", len(unrouted))
+
+    per_channel: dict[int, int] = defaultdict(int)
+    for row in rows:
+        per_channel[row["channel_id"]] += 1
+    return dict(per_channel)
+
+
+def channels_with_pending(db: Session) -> list[int]:
+    """Return ids of enabled channels that have deliveries waiting to be sent."""
+    return list(
+        db.execute(
+            select(Delivery.channel_id)
+            .join(Channel, Channel.id == Delivery.channel_id)
+            .where(Delivery.status == DeliveryStatus.pending, Channel.enabled == True)
+            .distinct()
+        )
+        .scalars()
+        .all())
+
+
+class SendBudget:
+    """Sliding one-hour send window plus a minimum gap for one channel."""
+
+    def __init__(self, db: Session, channel: Channel, now: datetime):
+        self.rate_per_hour = channel.rate_per_hour
+        self.min_interval = timedelta(seconds=channel.min_interval_seconds or 0)
+        self.sent: deque[datetime] = deque(
+            db.execute(
+                select(Delivery.sent_at)
+                .where(
+                    Delivery.channel_id == channel.id,
+                    Delivery.sent_at >= now - timedelta(hours=1),
+                )
+                .order_by(Delivery.sent_at)
+            )
+            .scalars()
+            .all())
+
+    def wait_seconds(self, now: datetime) -> float:
+        """Seconds until the next send is allowed."""
+        while self.sent and self.sent[0] <= now - timedelta(hours=1):
+            self.sent.popleft()
+
+        ready_at = now
+        if self.sent:
+            ready_at = max(ready_at, self.sent[-1] + self.min_interval)
+        if self.rate_per_hour and len(self.sent) >= self.rate_per_hour:
+            ready_at = max(ready_at, self.sent[-self.rate_per_hour] + timedelta(hours=1))
+        return (ready_at - now).total_seconds()
+
+    def record(self, sent_at: datetime) -> None:
+        self.sent.append(sent_at)
+
+
+def settle_posts(db: Session, post_ids: list[int]) -> None:
+    """Update the status of posts from their deliveries. The caller commits.
+
+    All sent -> published; any failed with no retry left -> failed;
+    otherwise the post stays `generated` while deliveries are in flight.
+    """
+    if not post_ids:
+        return
+
+    open_delivery = (Delivery.status == DeliveryStatus.pending) | Delivery.next_retry_at.is_not(None)
+    final_failure = (Delivery.status == DeliveryStatus.failed) & Delivery.next_retry_at.is_(None)
+    rows = db.execute(
+        select(
+            Delivery.post_id,
+            func.count().filter(open_delivery),
+            func.count().filter(final_failure),
+            func.max(Delivery.sent_at),
+        )
+        .where(Delivery.post_id.in_(post_ids))
+        .group_by(Delivery.post_id)
+    ).all()
+
+    for post_id, open_count, failed_count, last_sent_at in rows:
+        if open_count:
+            continue
+        if failed_count:
+            values = {
+                "status": PostStatus.failed,
+                "error": f"Delivery failed for {failed_count} channel(s)",
+            }
+        else:
+            values = {"status": PostStatus.published, "published_at": last_sent_at, "error": None}
+        db.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,17 @@
+"""Shared Redis connection for cache, filters and coordination state."""
+
+from __future__ import annotations
+
+import redis
+
+from app.config import settings
+
+_redis: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """Return a lazily created Redis client."""
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=0.5)
+    return _redis
@@ -0,0 +1,129 @@
+"""Circuit breakers and retry backoff for external backends.
+
+Each backend (``openai``, ``telegram``, ``site:<host>``) gets a breaker that
+opens after BREAKER_FAILURE_THRESHOLD consecutive failures. While open, calls
+fail immediately with `CircuitOpenError`; after BREAKER_RESET_SECONDS one
+probe call is let through (half-open) and its outcome closes or re-opens the
+breaker. Breaker state is per process.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import logging
+import random
+import threading
+import time
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class PermanentError(RuntimeError):
+    """A failure that will not go away on retry (e.g. a rejected request)."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == OPEN and self.retry_after() == 0:
+                self.state = HALF_OPEN
+                log.info("Circuit '%s' half-open, probing", self.name)
+            if self.state == OPEN:
+                raise CircuitOpenError(self.name, self.retry_after())
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                log.info("Circuit '%s' closed", self.name)
+            self.state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    log.warning("Circuit '%s' opened after %s failures", self.name, self._failures)
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    @contextmanager
+    def guard(self, exclude: tuple[type[BaseException], ...] = ()):
+        """Wrap one backend call; works around `await` in async code too.
+
+        Exceptions listed in `exclude` mean the backend answered (e.g. a 400)
+        and count as success for the breaker.
+        """
+        self.before_call()
+        try:
+            yield self
+        except exclude:
+            self.record_success()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        else:
+            self.record_success()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a backend."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                settings.BREAKER_FAILURE_THRESHOLD,
+                settings.BREAKER_RESET_SECONDS,
+            )
+    return breaker
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given 1-based attempt."""
+    ceiling = min(settings.RETRY_MAX_SECONDS, settings.RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(ceiling / 2, ceiling)
@@ -0,0 +1,162 @@
+"""Archival of old published/failed posts and their news items."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import gzip
+import json
+import logging
+from pathlib import Path
+
+from sqlalchemy import delete, insert, select, union, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import BASE_DIR, settings
+from app.models import Delivery, NewsItem, NewsTombstone, Post, PostStatus, TextBlob
+
+log = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_FOLDER = BASE_DIR / "archive"
+ARCHIVE_FOLDER = Path(settings.ARCHIVE_FOLDER) if settings.ARCHIVE_FOLDER else DEFAULT_ARCHIVE_FOLDER
+
+ARCHIVED_STATUSES = (PostStatus.published, PostStatus.failed, PostStatus.expired, PostStatus.merged)
+
+
+def _record(post: Post) -> dict:
+    news = post.news
+    return {
+        "post": {
+            "id": post.id,
+            "news_id": post.news_id,
+            "generated_text": post.generated_text,
+            "published_at": post.published_at,
+            "status": post.status.value,
+            "error": post.error,
+            "merged_into_id": post.merged_into_id,
+            "created_at": post.created_at,
+        },
+        "deliveries": [
+            {
+                "channel_id": delivery.channel_id,
+                "status": delivery.status.value,
+                "error": delivery.error,
+                "sent_at": delivery.sent_at,
+            }
+            for delivery in post.deliveries
+        ],
+        "news": {
+            "id": news.id,
+            "title": news.title,
+            "url": news.url,
+            "summary": news.summary,
+            "source": news.source,
+            "published_at": news.published_at,
+            "raw_text": news.raw_text,
+            "fingerprint": news.fingerprint,
+            "created_at": news.created_at,
+        },
+    }
+
+
+def _pending_path(path: Path) -> Path:
+    return path.with_name(path.name + ".tmp")
+
+
+def _write_archive(path: Path, records: list[dict]) -> None:
+    """Write records as gzipped NDJSON under the pending name of `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(_pending_path(path), "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=str))
+            f.write("\n")
+
+
+def commit_archive(path: Path) -> None:
+    """Give an archive its final name once its deletions are committed."""
+    _pending_path(path).replace(path)
+
+
+def discard_archive(path: Path) -> None:
+    """Remove an archive whose deletions were rolled back."""
+    _pending_path(path).unlink(missing_ok=True)
+
+
+def archive_batch(db: Session, cutoff: datetime, path: Path) -> int:
+    """Archive up to RETENTION_BATCH_SIZE expired posts into `path`.
+
+    Archived news fingerprints go to `news_tombstones`, then the posts, news
+    items, their deliveries and no longer referenced text blobs are deleted.
+    The file is written under a pending name: the caller commits, then calls
+    `commit_archive` (or `discard_archive` if the commit fails), so a
+    rolled-back batch never leaves an archive that a retry would duplicate.
+    Returns the number of archived posts.
+    """
+    posts = (
+        db.execute(
+            select(Post)
+            .options(joinedload(Post.news), selectinload(Post.deliveries))
+            .where(
+                Post.status.in_(ARCHIVED_STATUSES),
+                Post.created_at < cutoff,
+                # failed posts still waiting for a retry are kept
+                Post.next_retry_at.is_(None),
+            )
+            .order_by(Post.id)
+            .limit(settings.RETENTION_BATCH_SIZE)
+        )
+        .scalars()
+        .all())
+
+    if not posts:
+        return 0
+
+    _write_archive(path, [_record(post) for post in posts])
+
+    post_ids = [post.id for post in posts]
+    news_ids = [post.news_id for post in posts]
+    blob_hashes = {
+        digest
+        for post in posts
+        for digest in (post.news.summary_hash, post.news.raw_text_hash)
+        if digest is not None
+    }
+
+    now = datetime.utcnow()
+    # a news item can be archived twice if it was collected again; keep the first tombstone
+    fingerprints = {post.news.fingerprint for post in posts}
+    fingerprints -= set(
+        db.execute(select(NewsTombstone.fingerprint).where(NewsTombstone.fingerprint.in_(fingerprints)))
+        .scalars()
+        .all())
+    if fingerprints:
+        db.execute(
+            insert(NewsTombstone),
+            [{"fingerprint": fp, "archived_at": now} for fp in fingerprints],
+        )
+    db.execute(
+        update(Post)
+        .where(Post.merged_into_id.in_(post_ids))
+        .values(merged_into_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(delete(Delivery).where(Delivery.post_id.in_(post_ids)))
+    db.execute(delete(Post).where(Post.id.in_(post_ids)))
+    db.execute(delete(NewsItem).where(NewsItem.id.in_(news_ids)))
+
+    if blob_hashes:
+        used = set(
+            db.execute(
+                union(
+                    select(NewsItem.summary_hash).where(NewsItem.summary_hash.in_(blob_hashes)),
+                    select(NewsItem.raw_text_hash).where(NewsItem.raw_text_hash.in_(blob_hashes)),
+                )
+            )
+            .scalars()
+            .all())
+        unused = blob_hashes - used
+        if unused:
+            db.execute(delete(TextBlob).where(TextBlob.hash.in_(unused)))
+
+    db.expunge_all()
+    log.info("Archived %s posts to %s", len(post_ids), path)
+    return len(post_ids)
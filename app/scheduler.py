@@ -0,0 +1,108 @@
+"""Adaptive per-source polling schedule."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Source
+
+log = logging.getLogger(__name__)
+
+# Weight of the latest observation in the smoothed new-item rate.
+RATE_SMOOTHING = 0.3
+
+# A quiet source's interval grows at most this much per poll.
+MAX_INTERVAL_GROWTH = 2.0
+
+
+def _min_interval() -> int:
+    return settings.POLL_MIN_INTERVAL_MINUTES * 60
+
+
+def _max_interval() -> int:
+    return settings.POLL_MAX_INTERVAL_MINUTES * 60
+
+
+def _clamp(seconds: float) -> int:
+    return int(min(max(seconds, _min_interval()), _max_interval()))
+
+
+def claim_due_sources(
+    db: Session,
+    now: datetime | None = None,
+    timeout: int | None = None,
+) -> list[Source]:
+    """Return enabled sources whose next poll time has come.
+
+    Each returned source gets its `next_poll_at` pushed forward by its current
+    interval, so a slow collection is not dispatched again by the next tick.
+    A `timeout` caps that push: a source whose collection never reported back
+    (e.g. its worker died) is claimed again once the timeout passes.
+    """
+    now = now or datetime.utcnow()
+    sources = (
+        db.execute(
+            select(Source)
+            .where(
+                Source.enabled == True,
+                or_(Source.next_poll_at.is_(None), Source.next_poll_at <= now),
+            )
+            .order_by(Source.next_poll_at)
+        )
+        .scalars()
+        .all())
+
+    for src in sources:
+        interval = src.poll_interval_seconds or _clamp(settings.POLL_INTERVAL_MINUTES * 60)
+        if timeout:
+            interval = min(interval, timeout)
+        src.next_poll_at = now + timedelta(seconds=interval)
+
+    return sources
+
+
+def record_poll(src: Source, new_items: int, error: str | None = None, now: datetime | None = None) -> None:
+    """Adapt the source interval after a poll and schedule the next one.
+
+    `new_items` counts unseen items before the keyword filter, so a busy
+    source is polled often even if little of it is kept. Successful polls
+    update a smoothed new-item rate and aim for about `POLL_TARGET_NEW_ITEMS`
+    new items per poll; the interval grows at most MAX_INTERVAL_GROWTH times
+    per poll, so a few quiet polls do not park a source at the maximum.
+    Failed polls back off exponentially from the current interval.
+    """
+    now = now or datetime.utcnow()
+    interval = src.poll_interval_seconds or _clamp(settings.POLL_INTERVAL_MINUTES * 60)
+
+    if error is not None:
+        src.error_count = (src.error_count or 0) + 1
+        src.last_error = error[:1000]
+        interval = _clamp(interval * settings.POLL_ERROR_BACKOFF_FACTOR)
+    else:
+        elapsed = interval
+        if src.last_polled_at is not None:
+            elapsed = max((now - src.last_polled_at).total_seconds(), 1.0)
+
+        rate = new_items / elapsed
+        src.item_rate = RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * (src.item_rate or 0.0)
+        src.error_count = 0
+        src.last_error = None
+        src.last_polled_at = now
+
+        if src.item_rate > 0:
+            target = settings.POLL_TARGET_NEW_ITEMS / src.item_rate
+        else:
+            target = _max_interval()
+        interval = _clamp(min(target, interval * MAX_INTERVAL_GROWTH))
+
+    src.poll_interval_seconds = interval
+    src.next_poll_at = now + timedelta(seconds=interval)
+    log.info(
+        "Source %s polled: new=%s error=%s next in %ss",
+        src.name, new_items, error is not None, interval,
+    )
@@ -0,0 +1,149 @@
+"""Relevance scoring and top-K selection of posts before generation."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import heapq
+import logging
+import math
+import re
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+
+from app.config import settings
+from app.models import Keyword, NewsItem, Post, PostStatus, Source
+
+log = logging.getLogger(__name__)
+
+# repeated mentions of a keyword add up to this many hits
+MAX_HITS_PER_KEYWORD = 3
+
+_WORD_RE = re.compile(r"\w{3,}")
+
+
+def _tokens(text: str) -> set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def source_weights(db: Session) -> dict[str, float]:
+    """Return source weights keyed by lowercased source name."""
+    return {
+        name.lower(): weight if weight is not None else 1.0
+        for name, weight in db.execute(select(Source.name, Source.weight))
+    }
+
+
+class Scorer:
+    """Score news items against keywords, source weights and recent posts.
+
+    score = (1 + weighted keyword hits) * recency * source weight * novelty * coverage
+    """
+
+    def __init__(self, db: Session, now: datetime):
+        self.now = now
+        self.keywords = [(k.word.lower(), k.weight or 1.0) for k in db.execute(select(Keyword)).scalars()]
+        self.source_weights = source_weights(db)
+
+        since = now - timedelta(hours=settings.SCORING_NOVELTY_HOURS)
+        recent_titles = db.execute(
+            select(NewsItem.title)
+            .join(Post, Post.news_id == NewsItem.id)
+            .where(
+                Post.status.in_([PostStatus.generated, PostStatus.published]),
+                Post.created_at >= since,
+            )
+        ).scalars()
+        self.recent_tokens = [tokens for tokens in map(_tokens, recent_titles) if tokens]
+
+    def keyword_score(self, news: NewsItem) -> float:
+        text = f"{news.title}\n{news.summary}\n{news.raw_text or ''}".lower()
+        return sum(
+            weight * min(text.count(word), MAX_HITS_PER_KEYWORD)
+            for word, weight in self.keywords
+        )
+
+    def recency(self, news: NewsItem) -> float:
+        age_hours = max((self.now - news.published_at).total_seconds() / 3600, 0.0)
+        return 0.5 ** (age_hours / settings.SCORING_RECENCY_HALF_LIFE_HOURS)
+
+    def novelty(self, news: NewsItem) -> float:
+        """1 minus the highest title similarity (Jaccard) to recently generated posts."""
+        tokens = _tokens(news.title)
+        if not tokens or not self.recent_tokens:
+            return 1.0
+        overlap = max(len(tokens & other) / len(tokens | other) for other in self.recent_tokens)
+        return 1.0 - overlap
+
+    def score(self, news: NewsItem, coverage: int = 1) -> float:
+        """Score a news item; `coverage` is how many items report the same story."""
+        source_weight = self.source_weights.get(news.source.lower(), 1.0)
+        return (
+            (1.0 + self.keyword_score(news))
+            * self.recency(news)
+            * source_weight
+            * self.novelty(news)
+            * (1.0 + math.log(coverage))
+        )
+
+
+def expire_stale(db: Session, now: datetime) -> int:
+    """Mark new posts whose news is older than SCORING_MAX_AGE_HOURS as expired."""
+    cutoff = now - timedelta(hours=settings.SCORING_MAX_AGE_HOURS)
+    stale_news = select(NewsItem.id).where(NewsItem.published_at < cutoff)
+    result = db.execute(
+        update(Post)
+        .where(Post.status == PostStatus.new, Post.news_id.in_(stale_news))
+        .values(status=PostStatus.expired)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def generation_budget(db: Session, now: datetime) -> int:
+    """Return how many posts may still be generated in the current window."""
+    since = now - timedelta(minutes=settings.GENERATION_WINDOW_MINUTES)
+    used = db.execute(
+        select(func.count(Post.id)).where(Post.generated_at >= since)
+    ).scalar_one()
+    return max(settings.GENERATION_TOP_K - used, 0)
+
+
+def select_for_generation(db: Session, now: datetime | None = None) -> list[Post]:
+    """Return the highest-scoring new posts that fit the generation budget.
+
+    Stale candidates are expired; the rest that do not fit stay `new` and
+    compete again in the next run. With GENERATION_TOP_K = 0 every new post
+    is returned, as before scoring existed.
+    """
+    now = now or datetime.utcnow()
+    query = (
+        select(Post)
+        .join(Post.news)
+        .options(
+            contains_eager(Post.news),
+            selectinload(Post.merged).joinedload(Post.news),
+        )
+        .where(Post.status == PostStatus.new)
+    )
+
+    if not settings.GENERATION_TOP_K:
+        return db.execute(query).scalars().all()
+
+    expired = expire_stale(db, now)
+    if expired:
+        log.info("Expired %s stale posts", expired)
+
+    budget = generation_budget(db, now)
+    if budget == 0:
+        log.info("Generation budget for this window is used up")
+        return []
+
+    candidates = db.execute(query).scalars().all()
+    scorer = Scorer(db, now)
+    for post in candidates:
+        post.score = scorer.score(post.news, coverage=1 + len(post.merged))
+
+    selected = heapq.nlargest(budget, candidates, key=lambda p: p.score)
+    log.info("Selected %s of %s candidates (budget %s)", len(selected), len(candidates), budget)
+    return selected
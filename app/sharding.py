@@ -0,0 +1,172 @@
+"""Consistent-hash sharding of source collection across worker nodes.
+
+Every worker node registers itself in a Redis sorted set (score = last
+heartbeat) and consumes its own queue ``collect.<node>``. The dispatcher
+builds a hash ring over the live nodes, with SHARD_VNODES points per node,
+and sends each due source to the node that owns ``Source.id`` on the ring.
+When a node joins or leaves, only the sources between its points and their
+predecessors move, about 1/N of the total. Without live nodes, collection
+falls back to the default queue.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import Counter
+from datetime import datetime
+import hashlib
+import logging
+import threading
+import time
+from typing import Iterable
+
+import redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Source
+from app.redis_client import get_redis
+
+log = logging.getLogger(__name__)
+
+MEMBERS_KEY = "aibot:shards:members"
+DISPATCHED_KEY = "aibot:shards:dispatched"
+QUEUE_PREFIX = "collect."
+
+
+def _hash(value: str) -> int:
+    # stable across processes, unlike the builtin hash()
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def shard_queue(node: str) -> str:
+    return f"{QUEUE_PREFIX}{node}"
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes."""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int):
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in set(nodes)
+            for i in range(vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def __bool__(self) -> bool:
+        return bool(self._nodes)
+
+    def node_for(self, key: int | str) -> str:
+        """Return the node owning the key: the first point clockwise from its hash."""
+        if not self._nodes:
+            raise LookupError("hash ring is empty")
+        i = bisect.bisect(self._hashes, _hash(str(key))) % len(self._hashes)
+        return self._nodes[i]
+
+
+# ---- membership
+
+def heartbeat(node: str) -> None:
+    """Mark a node as alive."""
+    get_redis().zadd(MEMBERS_KEY, {node: time.time()})
+
+
+def leave(node: str) -> None:
+    """Remove a node from the ring, e.g. on worker shutdown."""
+    get_redis().zrem(MEMBERS_KEY, node)
+
+
+def live_nodes() -> dict[str, float]:
+    """Return nodes with a recent heartbeat, mapped to its time; prune the rest."""
+    client = get_redis()
+    cutoff = time.time() - settings.SHARD_MEMBER_TTL_SECONDS
+    client.zremrangebyscore(MEMBERS_KEY, "-inf", cutoff)
+    return {
+        member.decode() if isinstance(member, bytes) else member: score
+        for member, score in client.zrangebyscore(MEMBERS_KEY, cutoff, "+inf", withscores=True)
+    }
+
+
+def start_heartbeat(node: str) -> threading.Event:
+    """Heartbeat from a daemon thread until the returned event is set."""
+    stopped = threading.Event()
+
+    def run():
+        while True:
+            try:
+                heartbeat(node)
+            except redis.RedisError as e:
+                log.warning("Shard heartbeat failed for %s: %s", node, e)
+            if stopped.wait(settings.SHARD_HEARTBEAT_SECONDS):
+                return
+
+    threading.Thread(target=run, name="aibot-shard-heartbeat", daemon=True).start()
+    return stopped
+
+
+# ---- routing
+
+def current_ring() -> HashRing:
+    """Return the ring over live nodes; empty if Redis is unavailable."""
+    try:
+        nodes = live_nodes()
+    except redis.RedisError as e:
+        log.warning("Shard membership unavailable: %s", e)
+        nodes = {}
+    return HashRing(nodes, settings.SHARD_VNODES)
+
+
+def assign(source_ids: Iterable[int], ring: HashRing) -> dict[int, str | None]:
+    """Map source ids to shard queues (None = default queue)."""
+    if not ring:
+        return {source_id: None for source_id in source_ids}
+    return {source_id: shard_queue(ring.node_for(source_id)) for source_id in source_ids}
+
+
+def count_dispatched(queues: Iterable[str | None]) -> None:
+    """Add dispatched collection tasks to the per-shard counters."""
+    counts = Counter(queue or "default" for queue in queues)
+    if not counts:
+        return
+    try:
+        pipe = get_redis().pipeline()
+        for queue, count in counts.items():
+            pipe.hincrby(DISPATCHED_KEY, queue, count)
+        pipe.execute()
+    except redis.RedisError as e:
+        log.warning("Shard counters not updated: %s", e)
+
+
+def shard_load(db: Session) -> list[dict]:
+    """Describe each live shard: its sources, expected polls per hour, dispatched tasks."""
+    nodes = live_nodes()
+    ring = HashRing(nodes, settings.SHARD_VNODES)
+    dispatched = {
+        key.decode() if isinstance(key, bytes) else key: int(value)
+        for key, value in get_redis().hgetall(DISPATCHED_KEY).items()
+    }
+
+    shards = {
+        node: {
+            "node": node,
+            "queue": shard_queue(node),
+            "last_heartbeat": datetime.utcfromtimestamp(seen),
+            "sources": 0,
+            "polls_per_hour": 0.0,
+            "dispatched": dispatched.get(shard_queue(node), 0),
+        }
+        for node, seen in nodes.items()
+    }
+    if ring:
+        rows = db.execute(
+            select(Source.id, Source.poll_interval_seconds).where(Source.enabled == True)
+        )
+        for source_id, interval in rows:
+            shard = shards[ring.node_for(source_id)]
+            shard["sources"] += 1
+            shard["polls_per_hour"] += 3600 / (interval or settings.POLL_INTERVAL_MINUTES * 60)
+
+    return sorted(shards.values(), key=lambda shard: shard["node"])
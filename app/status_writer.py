@@ -0,0 +1,112 @@
+"""Buffered post status updates for the generation loop.
+
+Instead of one transaction per post, status transitions are collected and
+written with one ORM bulk UPDATE (by primary key) every STATUS_BATCH_SIZE
+posts or STATUS_BATCH_MAX_MS milliseconds, then committed. The batch runs in
+a SAVEPOINT; if it fails, its rows are retried one savepoint each so a single
+bad row does not lose the others. With STATUS_BATCH_SIZE = 1 every post is
+committed on its own.
+
+The delay is enforced while the loop waits on slow calls made through
+`StatusWriter.call`, not only when the next row is added.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import logging
+import time
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Post
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StatusWriter:
+    """Collect per-post column values and commit them in batches."""
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int | None = None,
+        max_delay_ms: int | None = None,
+    ):
+        self.db = db
+        self.batch_size = max(batch_size or settings.STATUS_BATCH_SIZE, 1)
+        self.max_delay = (max_delay_ms if max_delay_ms is not None else settings.STATUS_BATCH_MAX_MS) / 1000
+        self._rows: list[dict[str, Any]] = []
+        self._first_at = 0.0
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> StatusWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if exc_type is None:
+            self.flush()
+            return
+        # keep what already happened (e.g. posts sent to Telegram) on record
+        try:
+            self.flush()
+        except SQLAlchemyError:
+            log.exception("Could not save %s buffered status updates", len(self._rows))
+
+    def add(self, post_id: int, **values: Any) -> None:
+        """Buffer new column values for a post; flush if the batch is due."""
+        if not self._rows:
+            self._first_at = time.monotonic()
+        self._rows.append({"id": post_id, **values})
+        if len(self._rows) >= self.batch_size or time.monotonic() - self._first_at >= self.max_delay:
+            self.flush()
+
+    def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a slow call (e.g. a model request) and flush buffered rows when they are due meanwhile.
+
+        `fn` runs in a helper thread while this thread keeps the session, so
+        pass it plain data, never ORM instances: the flush here may expire or
+        refresh them while `fn` reads them.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aibot-status-call")
+        future = self._executor.submit(fn, *args)
+        if self._rows:
+            remaining = self._first_at + self.max_delay - time.monotonic()
+            try:
+                return future.result(timeout=max(remaining, 0))
+            except FutureTimeout:
+                self.flush()
+        return future.result()
+
+    def flush(self) -> int:
+        """Write and commit the buffered updates. Returns the rows saved."""
+        rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+
+        saved = len(rows)
+        try:
+            with self.db.begin_nested():
+                self.db.execute(update(Post), rows)
+        except SQLAlchemyError as e:
+            log.warning("Batch status update failed, retrying %s rows one by one: %s", len(rows), e)
+            saved = 0
+            for row in rows:
+                try:
+                    with self.db.begin_nested():
+                        self.db.execute(update(Post), [row])
+                    saved += 1
+                except SQLAlchemyError:
+                    log.exception("Status update failed for post_id=%s", row["id"])
+
+        self.db.commit()
+        return saved
@@ -0,0 +1,66 @@
+"""Column types and codecs for the compact storage mode."""
+
+from __future__ import annotations
+
+import hashlib
+import zlib
+
+from sqlalchemy import LargeBinary, String
+from sqlalchemy.types import TypeDecorator
+
+from app.config import settings
+
+try:
+    from compression import zstd
+except ImportError:  # Python < 3.14
+    zstd = None
+
+
+def text_digest(text: str) -> bytes:
+    """Return the raw SHA-256 digest used as a text blob address."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def compress_text(text: str) -> tuple[str, bytes]:
+    """Compress text with zstd when available, otherwise zlib."""
+    raw = text.encode("utf-8")
+    if zstd is not None:
+        return "zstd", zstd.compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    """Inverse of `compress_text`."""
+    if codec == "zstd":
+        if zstd is None:
+            raise RuntimeError("zstd blob found but compression.zstd is unavailable")
+        return zstd.decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    return bytes(data).decode("utf-8")
+
+
+class HexDigest(TypeDecorator):
+    """SHA-256 hex digest, stored as 32 raw bytes in compact storage mode.
+
+    Python code always sees the 64-char hex string, so queries and API
+    schemas do not change.
+    """
+
+    impl = String(64)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if settings.COMPACT_STORAGE:
+            return dialect.type_descriptor(LargeBinary(32))
+        return dialect.type_descriptor(String(64))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or not settings.COMPACT_STORAGE:
+            return value
+        return bytes.fromhex(value)
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, (bytes, memoryview)):
+            return bytes(value).hex()
+        return value
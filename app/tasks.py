@@ -4,20 +4,42 @@ from __future__ import annotations
 
 import asyncio
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
+import enum
 import logging
+import threading
 
 from celery import Celery
-from sqlalchemy import select
+import redis
+from celery.signals import (
+    setup_logging as celery_setup_logging,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown,
+)
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
-from app.ai.generator import generate_telegram_post
+from app import profiling, sharding
+from app.bloom import fingerprint_filter
+from app.cache import bump_version
 from app.config import settings
-from app.database import SessionLocal
-from app.models import Keyword, NewsItem, Post, PostStatus, Source
-from app.news_parser.sites import parse_site_source
-from app.news_parser.telegram import parse_tg_source
-from app.telegram.publisher import publish_to_channel
+from app.database import SessionLocal, init_db
+from app.event_loop import run_sync, shutdown as shutdown_event_loop
+from app.logging_config import SAMPLED, restart_listener, setup_logging, stop_listener
+from app.ingest import store_items
+from app.models import Channel, Delivery, DeliveryStatus, Post, PostStatus, Source
+from app.publishing import SendBudget, channels_with_pending, fan_out, settle_posts
+from app.redis_client import get_redis
+from app.resilience import CircuitOpenError, PermanentError, backoff_delay
+from app.retention import ARCHIVE_FOLDER, archive_batch, commit_archive, discard_archive
+from app.scheduler import claim_due_sources, record_poll
+from app.scoring import select_for_generation, source_weights
+from app.status_writer import StatusWriter
 
 log = logging.getLogger(__name__)
 
@@ -35,23 +57,35 @@ celery_app.conf.task_routes = {
 }
 
 celery_app.conf.beat_schedule = {
-    "run-collect-tg-news-every-n-minutes": {
-        "task": "app.tasks.collect_tg_news_task",
-        "schedule": settings.POLL_INTERVAL_MINUTES * 60,
+    "dispatch-due-sources": {
+        "task": "app.tasks.dispatch_due_sources_task",
+        "schedule": settings.POLL_TICK_SECONDS,
     },
-    "run-collect-site-news-every-n-minutes": {
-        "task": "app.tasks.collect_site_news_task",
-        "schedule": settings.POLL_INTERVAL_MINUTES * 60,
+    "retry-failed-posts": {
+        "task": "app.tasks.retry_failed_posts_task",
+        "schedule": settings.RETRY_SWEEP_MINUTES * 60,
     },
 }
 
+if settings.RETENTION_DAYS:
+    celery_app.conf.beat_schedule["archive-old-posts"] = {
+        "task": "app.tasks.archive_old_posts_task",
+        "schedule": settings.RETENTION_INTERVAL_MINUTES * 60,
+    }
+
 celery_app.autodiscover_tasks(["app"])
 
+# lifetime of a channel's send lock; renewed after every delivery
+CHANNEL_LOCK_SECONDS = 600
+
+# set while an early retry sweep is queued; expires at its ETA
+RETRY_SWEEP_KEY = "aibot:retry-sweep:queued"
+
 
 @contextmanager
-def get_db():
+def get_db(**session_options):
     """Provide a transactional scope around a series of operations."""
-    db = SessionLocal()
+    db = SessionLocal(**session_options)
     try:
         yield db
         db.commit()
@@ -62,13 +96,151 @@ def get_db():
         db.close()
 
 
-def _passes_keyword_filter(db: Session, text: str) -> bool:
-    """Return True if the text matches at least one configured keyword."""
-    keywords = db.execute(select(Keyword)).scalars().all()
-    if not keywords:
-        return True
-    low = text.lower()
-    return any(k.word.lower() in low for k in keywords)
+@celery_setup_logging.connect
+def _setup_logging(**kwargs):
+    """Use the app's logging (queue, sampling, JSON) instead of Celery's."""
+    setup_logging()
+
+
+@worker_process_init.connect
+def _restart_log_listener(**kwargs):
+    """The log listener thread does not survive the fork into pool processes."""
+    restart_listener()
+
+
+@worker_init.connect
+def _init_db(**kwargs):
+    """Create missing tables once, before worker processes are forked."""
+    init_db()
+
+
+# set while this worker node is a collection shard
+_shard_heartbeat = None
+
+
+@worker_ready.connect
+def _join_shard_ring(sender=None, **kwargs):
+    """Consume this node's collection queue and start heartbeating its membership."""
+    global _shard_heartbeat
+    if not settings.SHARDING_ENABLED:
+        return
+    node = sender.hostname
+    sender.add_task_queue(sharding.shard_queue(node))
+    _shard_heartbeat = sharding.start_heartbeat(node)
+    log.info("Joined collection shards as %s", node)
+
+
+@worker_shutdown.connect
+def _leave_shard_ring(sender=None, **kwargs):
+    """Leave the ring right away so sources move before the membership TTL runs out."""
+    if _shard_heartbeat is None:
+        return
+    _shard_heartbeat.set()
+    try:
+        sharding.leave(sender.hostname)
+    except Exception as e:
+        log.warning("Could not leave collection shards: %s", e)
+
+
+# running task profiles by task id
+_profilers: dict[str, profiling.SamplingProfiler] = {}
+
+
+@task_prerun.connect
+def _start_task_profile(task_id=None, task=None, **kwargs):
+    """Profile the task if PROFILE_TASKS is on or it was sent with the `profile` header."""
+    if settings.PROFILE_TASKS or task.request.get("profile"):
+        _profilers[task_id] = profiling.start_profiler(profiling.task_threads(threading.get_ident()))
+
+
+@task_postrun.connect
+def _finish_task_profile(task_id=None, **kwargs):
+    profiler = _profilers.pop(task_id, None)
+    if profiler is not None:
+        profiling.finish_profiler(task_id, profiler)
+
+
+@worker_process_init.connect
+def _warm_bloom_filter(**kwargs):
+    """Fill the fingerprint filter from the DB when a worker process starts.
+
+    A shared filter is filled by whichever process takes the rebuild lock.
+    """
+    if not settings.BLOOM_ENABLED:
+        return
+    try:
+        if not fingerprint_filter.is_built():
+            with get_db() as db:
+                fingerprint_filter.rebuild(db)
+    except Exception as e:
+        log.warning("Bloom filter warm-up failed: %s", e)
+
+
+@worker_process_shutdown.connect
+def _close_event_loop(**kwargs):
+    """Disconnect async clients and stop the process event loop."""
+    shutdown_event_loop()
+    stop_listener()
+
+
+def _parse_source(src: Source) -> list[dict]:
+    """Fetch raw items for a single source."""
+    # parsers pull in requests/bs4/telethon, so load them on first use
+    if src.type.value == "site":
+        from app.news_parser.sites import parse_site_source
+        return parse_site_source(src)
+    if src.type.value == "tg":
+        from app.news_parser.telegram import parse_tg_source
+        return parse_tg_source(src)
+    raise Exception(f"Unknown source type: {src}")
+
+
+def _failure_values(
+    exc: Exception,
+    retry_count: int | None,
+    now: datetime,
+    status: enum.Enum = PostStatus.failed,
+) -> dict:
+    """Column values for a failed post or delivery, including when to retry it (if ever)."""
+    retry_count = (retry_count or 0) + 1
+    values = {
+        "status": status,
+        "error": str(exc),
+        "retry_count": retry_count,
+        "next_retry_at": None,
+    }
+    if isinstance(exc, PermanentError) or retry_count >= settings.RETRY_MAX_ATTEMPTS:
+        return values
+
+    delay = backoff_delay(retry_count)
+    # Telethon's FloodWaitError says how long Telegram wants us to wait
+    delay = max(delay, getattr(exc, "seconds", None) or 0)
+    values["next_retry_at"] = now + timedelta(seconds=delay)
+    return values
+
+
+def _schedule_retry_sweep(db: Session, model=Post, failed: enum.Enum = PostStatus.failed) -> None:
+    """Queue the retry sweeper early if a post or delivery is due before the next beat sweep.
+
+    Later retries are left to the periodic sweep, so no countdown outlives the
+    broker's visibility timeout, and a Redis key that expires with the
+    countdown keeps at most one early sweep queued.
+    """
+    next_retry_at = db.execute(
+        select(func.min(model.next_retry_at)).where(model.status == failed)
+    ).scalar_one_or_none()
+    if next_retry_at is None:
+        return
+    delay = max((next_retry_at - datetime.utcnow()).total_seconds(), 0.0)
+    if delay >= settings.RETRY_SWEEP_MINUTES * 60:
+        return
+    try:
+        if not get_redis().set(RETRY_SWEEP_KEY, 1, nx=True, px=int(delay * 1000) + 1000):
+            return
+    except redis.RedisError as e:
+        log.warning("Early retry sweep not scheduled: %s", e)
+        return
+    retry_failed_posts_task.apply_async(countdown=delay)
 
 
 def _collect_for_type(source_type: str) -> dict:
@@ -76,7 +248,8 @@ def _collect_for_type(source_type: str) -> dict:
     log.info("Collecting news for type %s", source_type)
     created_news_ids: list[int] = []
 
-    with get_db() as db:
+    # commit per source: no transaction stays open while a source is fetched
+    with get_db(expire_on_commit=False) as db:
         sources = (
             db.execute(
                 select(Source)
@@ -87,42 +260,28 @@ def _collect_for_type(source_type: str) -> dict:
             )
             .scalars()
             .all())
+        db.commit()
 
         log.info("Found %s enabled sources", len(sources))
 
         for src in sources:
             try:
-                if src.type.value == "site":
-                    items = parse_site_source(src)
-                elif src.type.value == "tg":
-                    items = parse_tg_source(src)
-                else:
-                    raise Exception(f"Unknown source type: {src}")
+                items = _parse_source(src)
             except Exception as e:
                 log.exception("Parse failed for source=%s: %s", src.name, e)
+                record_poll(src, 0, error=str(e))
+                db.commit()
                 continue
 
-            for it in items:
-                full_text = f"{it.get('title', '')}\n{it.get('summary', '')}\n{it.get('raw_text', '') or ''}"
-
-                log.info("Collected news: %s", it.get("title", ""))
-                if not _passes_keyword_filter(db, full_text):
-                    log.info("Keyword filter rejected news for source=%s", src.name)
-                    continue
+            created, unseen = store_items(db, src, items)
+            record_poll(src, unseen)
+            db.commit()
+            created_news_ids.extend(created)
 
-                news = NewsItem(**it)
-                db.add(news)
-                try:
-                    db.flush()
-                except Exception:
-                    db.rollback()
-                    continue
-
-                created_news_ids.append(news.id)
-                post = Post(news_id=news.id, status=PostStatus.new)
-                db.add(post)
-
-        db.commit()
+    # poll state changed too
+    bump_version("sources")
+    if created_news_ids:
+        bump_version("news", "posts")
     return {"created_news": len(created_news_ids)}
 
 
@@ -160,51 +319,178 @@ def collect_tg_news_task():
     return _collect_for_type("tg")
 
 
+@celery_app.task(name="app.tasks.dispatch_due_sources_task")
+def dispatch_due_sources_task():
+    """
+    Send collection tasks for sources that are due.
+
+    Periodic task (Celery Beat), runs every POLL_TICK_SECONDS.
+    Each source keeps its own next poll time, see app.scheduler.
+    With SHARDING_ENABLED each source goes to the queue of the node that
+    owns it on the hash ring, see app.sharding. A node can die with tasks in
+    its queue, so a claim then lasts SHARD_CLAIM_TIMEOUT_SECONDS: a source
+    that was not collected by then is claimed again for a live node, and the
+    stranded task expires so a returning node does not run it late.
+    """
+    timeout = settings.SHARD_CLAIM_TIMEOUT_SECONDS if settings.SHARDING_ENABLED else None
+    with get_db() as db:
+        source_ids = [src.id for src in claim_due_sources(db, timeout=timeout)]
+    if source_ids:
+        bump_version("sources")
+
+    if settings.SHARDING_ENABLED:
+        queues = sharding.assign(source_ids, sharding.current_ring())
+        for source_id, queue in queues.items():
+            collect_source_task.apply_async((source_id,), queue=queue, expires=timeout)
+        sharding.count_dispatched(queues.values())
+    else:
+        for source_id in source_ids:
+            collect_source_task.delay(source_id)
+
+    log.info("Dispatched %s due sources", len(source_ids))
+    return {"dispatched": source_ids}
+
+
+@celery_app.task(name="app.tasks.collect_source_task")
+def collect_source_task(source_id: int):
+    """Collect news from one source and adapt its polling interval."""
+    with get_db(expire_on_commit=False) as db:
+        src = db.get(Source, source_id)
+        if not src or not src.enabled:
+            return {"error": "source not found"}
+        # end the read transaction before fetching the source
+        db.commit()
+
+        try:
+            items = _parse_source(src)
+        except Exception as e:
+            log.exception("Parse failed for source=%s: %s", src.name, e)
+            record_poll(src, 0, error=str(e))
+            db.commit()
+            bump_version("sources")
+            return {"error": str(e)}
+
+        created_news_ids, unseen = store_items(db, src, items)
+        db.commit()
+
+        record_poll(src, unseen)
+
+    bump_version("sources")
+    if created_news_ids:
+        bump_version("news", "posts")
+    return {"created_news": len(created_news_ids)}
+
+
+@celery_app.task(name="app.tasks.rebuild_bloom_filter_task")
+def rebuild_bloom_filter_task():
+    """Rebuild the fingerprint Bloom filter from the database."""
+    with get_db() as db:
+        count = fingerprint_filter.rebuild(db)
+    if count is None:
+        return {"error": "rebuild already running"}
+    return {"fingerprints": count}
+
+
+@celery_app.task(name="app.tasks.archive_old_posts_task")
+def archive_old_posts_task():
+    """
+    Archive published, failed and expired posts older than RETENTION_DAYS.
+
+    Periodic task (Celery Beat).
+    Each batch is written to its own gzipped NDJSON file and deleted in its
+    own transaction; at most RETENTION_MAX_BATCHES batches run per call.
+    """
+    if not settings.RETENTION_DAYS:
+        return {"error": "retention is disabled"}
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=settings.RETENTION_DAYS)
+    stamp = now.strftime("%Y%m%d%H%M%S")
+    archived = 0
+
+    for batch in range(settings.RETENTION_MAX_BATCHES):
+        path = ARCHIVE_FOLDER / f"posts-{stamp}-{batch:04d}.ndjson.gz"
+        try:
+            with get_db() as db:
+                count = archive_batch(db, cutoff, path)
+        except Exception:
+            discard_archive(path)
+            raise
+        if count:
+            commit_archive(path)
+        archived += count
+        if count < settings.RETENTION_BATCH_SIZE:
+            break
+
+    if archived:
+        bump_version("news", "posts")
+    return {"archived": archived}
+
+
 @celery_app.task(name="app.tasks.ai_generate_posts_task")
 def ai_generate_posts_task():
     """Generate post texts for news items without generated text."""
+    from app.ai.generator import NewsText, generate_cluster_post, generate_telegram_post
+
     log.info("Run app.tasks.ai_generate_posts_task")
     posts_generated: list[int] = []
-    with get_db() as db:
-        posts = (
-            db.execute(
-                select(Post)
-                .join(Post.news)
-                .where(
-                    Post.status == PostStatus.new
-                )
-            )
-            .scalars()
-            .all())
+    # objects stay loaded across the batch commits, so the loop issues no
+    # per-post SELECTs; news and cluster members come eager-loaded
+    with get_db(expire_on_commit=False) as db:
+        if settings.CLUSTER_ENABLED:
+            from app.clustering import merge_clusters
+            merge_clusters(db)
+            db.flush()
+
+        posts = select_for_generation(db)
+        weights = source_weights(db)
+        # release the cluster writes before the model calls
+        db.commit()
 
         log.info("Found %s posts to generate", len(posts))
         if not posts:
             return {"error": "posts not found"}
 
-        for post in posts:
+        with StatusWriter(db) as writer:
+            for post in posts:
 
-            post_id = post.id
-            news_id = post.news_id
-
-            try:
-                text = generate_telegram_post(post.news)
-                post.generated_text = text
-                post.status = PostStatus.generated
-                post.error = None
-                db.commit()
-                posts_generated.append(post_id)
+                post_id = post.id
+                news_id = post.news_id
+                priority = weights.get(post.news.source.lower(), 1.0)
 
-            except Exception as e:
+                try:
+                    if post.merged:
+                        news_items = [post.news, *(m.news for m in post.merged)]
+                        priority = max(weights.get(n.source.lower(), 1.0) for n in news_items)
+                        texts = [NewsText.of(n) for n in news_items]
+                        text = writer.call(generate_cluster_post, texts, priority)
+                    else:
+                        text = writer.call(generate_telegram_post, NewsText.of(post.news), priority)
+
+                except CircuitOpenError as e:
+                    # the remaining posts stay `new` until the breaker lets a probe through
+                    log.warning("Generation paused: %s", e)
+                    ai_generate_posts_task.apply_async(countdown=e.retry_after)
+                    break
+
+                except Exception as e:
+                    log.exception("Generate post failed for news_id=%s post_id=%s: %s", news_id, post_id, e)
+                    writer.add(post_id, **_failure_values(e, post.retry_count, datetime.utcnow()))
+                    continue
 
-                log.exception("Generate post failed for news_id=%s post_id=%s: %s", news_id, post_id, e)
-                db.rollback()
+                writer.add(
+                    post_id,
+                    generated_text=text,
+                    status=PostStatus.generated,
+                    generated_at=datetime.utcnow(),
+                    error=None,
+                    next_retry_at=None,
+                )
+                posts_generated.append(post_id)
 
-                post = db.get(Post, post_id)
-                if post:
-                    post.status = PostStatus.failed
-                    post.error = str(e)
-                    db.commit()
+        _schedule_retry_sweep(db)
 
+    bump_version("posts")
     return {
         'generated': posts_generated,
         'count': len(posts_generated)
@@ -213,56 +499,192 @@ def ai_generate_posts_task():
 
 @celery_app.task(name="app.tasks.publish_posts_task")
 def publish_posts_task():
-    """Publish generated posts to Telegram."""
-    asyncio.run(_publish_posts_task())
+    """
+    Route generated posts to channels and queue their delivery.
+
+    Every generated post gets a delivery per matching channel (see
+    app.publishing); each channel with pending deliveries gets its own
+    deliver_channel_task.
+    """
+    with get_db() as db:
+        created = fan_out(db)
+        db.commit()
+        channel_ids = channels_with_pending(db)
+
+    for channel_id in channel_ids:
+        deliver_channel_task.delay(channel_id)
+
+    if created:
+        bump_version("posts")
+    return {
+        'deliveries': sum(created.values()),
+        'channels': channel_ids,
+    }
+
+
+@celery_app.task(name="app.tasks.deliver_channel_task")
+def deliver_channel_task(channel_id: int):
+    """Send pending deliveries of one channel, in order and within its send budget."""
+    # one sender per channel, so order and budget hold across workers
+    lock = get_redis().lock(f"aibot:channel:{channel_id}:send", timeout=CHANNEL_LOCK_SECONDS)
+    if not lock.acquire(blocking=False):
+        return {"error": "channel is being sent by another task"}
+    try:
+        return run_sync(_deliver_channel(channel_id, lock))
+    finally:
+        try:
+            lock.release()
+        except Exception as e:
+            log.warning("Channel %s send lock not released: %s", channel_id, e)
+
+
+def _resume_channel(channel_id: int, delay: float) -> None:
+    """Queue the channel's next delivery run after `delay` seconds.
 
+    The countdown is capped below RETRY_SWEEP_MINUTES, like the early retry
+    sweep, so it never outlives the broker's visibility timeout; a run that
+    wakes up early finds the budget still spent and queues the next hop.
+    """
+    countdown = min(delay, settings.RETRY_SWEEP_MINUTES * 60 - 1)
+    deliver_channel_task.apply_async((channel_id,), countdown=max(countdown, 0))
+
+
+async def _deliver_channel(channel_id: int, lock) -> dict:
+    """Async helper to send one channel's pending deliveries."""
+    from app.telegram.publisher import publish_to_chat
+
+    sent: list[int] = []
+    # every delivery is committed; keep the channel loaded across the commits
+    with get_db(expire_on_commit=False) as db:
+        channel = db.get(Channel, channel_id)
+        if channel is None or not channel.enabled:
+            return {"error": "channel not found"}
+
+        # only the columns the loop needs; results are written back by id
+        rows = db.execute(
+            select(Delivery.id, Delivery.post_id, Delivery.retry_count, Post.generated_text)
+            .join(Post, Post.id == Delivery.post_id)
+            .where(
+                Delivery.channel_id == channel_id,
+                Delivery.status == DeliveryStatus.pending,
+            )
+            .order_by(Delivery.id)
+        ).all()
+
+        budget = SendBudget(db, channel, datetime.utcnow())
+        # no transaction stays open across the sleeps and sends
+        db.commit()
+        post_ids: list[int] = []
+        for delivery_id, post_id, retry_count, text in rows:
+            wait = budget.wait_seconds(datetime.utcnow())
+            if wait > settings.CHANNEL_MAX_INLINE_WAIT_SECONDS:
+                log.info("Channel %s is over its send budget, resuming in %.0fs", channel.name, wait)
+                _resume_channel(channel_id, wait)
+                break
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                await publish_to_chat(channel.chat, text)
 
-async def _publish_posts_task():
-    """Async helper to publish generated posts."""
-    post_published: list[int] = []
+            except CircuitOpenError as e:
+                # the remaining deliveries stay pending until the breaker lets a probe through
+                log.warning("Publishing to %s paused: %s", channel.name, e)
+                _resume_channel(channel_id, e.retry_after)
+                break
+
+            except Exception as e:
+                log.exception("Delivery failed for post_id=%s channel=%s: %s", post_id, channel.name, e)
+                values = _failure_values(e, retry_count, datetime.utcnow(), DeliveryStatus.failed)
+
+            else:
+                now = datetime.utcnow()
+                budget.record(now)
+                values = {"status": DeliveryStatus.sent, "sent_at": now, "error": None, "next_retry_at": None}
+                sent.append(post_id)
+                log.info('Post %s published to %s', post_id, channel.name, extra=SAMPLED)
+
+            # commit each delivery: a sent message must not be sent again
+            db.execute(
+                update(Delivery)
+                .where(Delivery.id == delivery_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            post_ids.append(post_id)
+            lock.reacquire()
+
+        settle_posts(db, post_ids)
+        db.commit()
+        _schedule_retry_sweep(db, Delivery, DeliveryStatus.failed)
+
+    if post_ids:
+        bump_version("posts")
+    return {
+        'published': sent,
+        'count': len(sent),
+    }
+
+
+@celery_app.task(name="app.tasks.retry_failed_posts_task")
+def retry_failed_posts_task():
+    """
+    Re-queue failed posts whose retry is due.
+
+    Periodic task (Celery Beat), also scheduled with an ETA after failures.
+    Posts with generated text go back to publishing, the rest to generation;
+    failed deliveries go back to their channel.
+    """
+    now = datetime.utcnow()
     with get_db() as db:
+        deliveries = db.execute(
+            select(Delivery.id, Delivery.channel_id)
+            .where(
+                Delivery.status == DeliveryStatus.failed,
+                Delivery.next_retry_at <= now,
+            )
+        ).all()
+        if deliveries:
+            db.execute(
+                update(Delivery)
+                .where(Delivery.id.in_([delivery_id for delivery_id, _ in deliveries]))
+                .values(status=DeliveryStatus.pending, next_retry_at=None)
+                .execution_options(synchronize_session=False)
+            )
+        channel_ids = sorted({channel_id for _, channel_id in deliveries})
+
         posts = (
             db.execute(
                 select(Post)
                 .where(
-                    Post.status == PostStatus.generated
+                    Post.status == PostStatus.failed,
+                    Post.next_retry_at <= now,
                 )
             )
             .scalars()
             .all())
 
-        if not posts:
-            return {"error": "posts not found"}
-
+        to_generate = to_publish = 0
         for post in posts:
-            post_id = post.id
-
-            try:
-                if not post:
-                    continue
-
-                await publish_to_channel(post.generated_text, 5)
-                post.status = PostStatus.published
-                post.published_at = datetime.now()
-                post.error = None
-                db.commit()
-                post_published.append(post_id)
-
-                log.info('Post published: %s', post_id)
-
-            except Exception as e:
-                db.rollback()
-                post = db.get(Post, post_id)
-                if post:
-                    post.status = PostStatus.failed
-                    post.error = str(e)
-                    db.commit()
-                log.exception("Publish post failed for post_id=%s: %s", post_id, e)
-
-    return {
-        'published': post_published,
-        'count': len(post_published),
-    }
+            if post.generated_text:
+                post.status = PostStatus.generated
+                to_publish += 1
+            else:
+                post.status = PostStatus.new
+                to_generate += 1
+            post.next_retry_at = None
+
+    if to_generate:
+        ai_generate_posts_task.delay()
+    if to_publish:
+        publish_posts_task.delay()
+    for channel_id in channel_ids:
+        deliver_channel_task.delay(channel_id)
+    if posts or deliveries:
+        bump_version("posts")
+        log.info("Re-queued %s failed posts and %s deliveries", len(posts), len(deliveries))
+    return {"generate": to_generate, "publish": to_publish, "deliveries": len(deliveries)}
 
 
 if __name__ == "__main__":
@@ -3,9 +3,13 @@ import logging
 
 from telethon import TelegramClient
 from app.config import settings
+from app.event_loop import on_shutdown
+from app.resilience import get_breaker
 
 log = logging.getLogger(__name__)
 
+# the client and lock belong to the process event loop (app.event_loop),
+# so they stay connected across Celery tasks
 _client = None
 _client_lock = asyncio.Lock()
 
@@ -25,6 +29,7 @@ async def get_shared_client() -> TelegramClient:
                 api_id=settings.TG_API_ID,
                 api_hash=settings.TG_API_HASH,
             ).start(bot_token=settings.TG_BOT_TOKEN)
+            on_shutdown(disconnect)
         else:
             if not _client.is_connected():
                 await _client.connect()
@@ -36,10 +41,12 @@ async def send_async(channel: str, text: str, delay: float) -> None:
     if delay > 0:
         log.info('Delay set to %s', delay)
         await asyncio.sleep(delay)
-    await client.send_message(channel, text)
+    with get_breaker("telegram").guard():
+        await client.send_message(channel, text)
 
 
 async def disconnect() -> None:
     global _client
     if isinstance(_client, TelegramClient):
-        _client.disconnect()
+        await _client.disconnect()
+        _client = None
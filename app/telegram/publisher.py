@@ -1,4 +1,5 @@
 from app.config import settings
+from app.logging_config import SAMPLED
 from app.telegram.bot import send_async
 
 import logging
@@ -7,12 +8,18 @@ log = logging.getLogger(__name__)
 
 
 async def publish_to_channel(text: str, delay: float = 0) -> None:
-    # DRYRUN если не настроили канал
-    log.info("Publishing to channel: %s", text)
-    log.info("TG_TARGET_CHANNEL: %s", settings.TG_TARGET_CHANNEL)
+    """Send text to TG_TARGET_CHANNEL."""
+    await publish_to_chat(settings.TG_TARGET_CHANNEL, text, delay)
 
-    if not settings.TG_TARGET_CHANNEL:
-        log.warning("Publish skipped: TG_TARGET_CHANNEL is not set")
+
+async def publish_to_chat(chat: str | None, text: str, delay: float = 0) -> None:
+    """Send text to `chat`; no fallback to TG_TARGET_CHANNEL."""
+    # DRYRUN если у канала не задан чат
+    log.info("Publishing to channel: %s", text, extra=SAMPLED)
+    log.info("Target chat: %s", chat, extra=SAMPLED)
+
+    if not chat:
+        log.warning("Publish skipped: no target chat is set")
         return
 
-    await send_async(settings.TG_TARGET_CHANNEL, text, delay)
+    await send_async(chat, text, delay)
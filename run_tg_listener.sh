@@ -0,0 +1 @@
+python -m app.news_parser.tg_listener
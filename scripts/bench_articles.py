@@ -0,0 +1,90 @@
+"""Measure article-body fetching throughput on recorded HTML fixtures.
+
+Pages from ``scripts/fixtures/articles/*.html`` are served through an
+in-memory transport with simulated latency, so no network is used.
+
+    python scripts/bench_articles.py [--items 200] [--hosts 4] [--latency 0.2]
+    python scripts/bench_articles.py --record https://habr.com/ru/news/123/ ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sys
+import time
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "articles"
+
+sys.path.insert(0, str(BASE_DIR))
+
+from app.config import settings  # noqa: E402
+from app.news_parser.articles import DEFAULT_HEADERS, fetch_article_texts  # noqa: E402
+
+
+def record(urls: list[str]) -> None:
+    """Save live pages into the fixtures directory."""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(headers=DEFAULT_HEADERS, follow_redirects=True, timeout=30) as client:
+        for i, url in enumerate(urls):
+            response = client.get(url)
+            response.raise_for_status()
+            path = FIXTURES_DIR / f"recorded_{int(time.time())}_{i}.html"
+            path.write_bytes(response.content)
+            print(f"saved {url} -> {path.name}")
+
+
+def make_transport(pages: list[bytes], latency: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency * random.uniform(0.5, 1.5))
+        body = pages[hash(request.url.path) % len(pages)]
+        return httpx.Response(200, content=body, headers={"content-type": "text/html; charset=utf-8"})
+
+    return httpx.MockTransport(handler)
+
+
+def run(urls: list[str], pages: list[bytes], latency: float) -> float:
+    transport = make_transport(pages, latency)
+    started = time.perf_counter()
+    texts = asyncio.run(fetch_article_texts(urls, transport=transport))
+    elapsed = time.perf_counter() - started
+    assert len(texts) == len(urls), f"extracted {len(texts)} of {len(urls)}"
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="mean response latency, seconds")
+    parser.add_argument("--delay", type=float, default=0.0, help="politeness delay per host, seconds")
+    parser.add_argument("--record", nargs="+", metavar="URL")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    pages = [path.read_bytes() for path in sorted(FIXTURES_DIR.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"no fixtures in {FIXTURES_DIR}")
+
+    urls = [f"https://host{i % args.hosts}.test/article/{i}" for i in range(args.items)]
+    settings.ARTICLE_HOST_DELAY_SECONDS = args.delay
+
+    for per_host in (1, settings.ARTICLE_MAX_PER_HOST):
+        settings.ARTICLE_MAX_PER_HOST = per_host
+        elapsed = run(urls, pages, args.latency)
+        print(
+            f"max_per_host={per_host}: {args.items} articles from {len(pages)} fixtures "
+            f"in {elapsed:.2f}s ({args.items / elapsed:.1f} articles/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
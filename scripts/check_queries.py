@@ -0,0 +1,141 @@
+"""Check that generation and publishing issue a constant number of SELECTs.
+
+Runs both tasks against a throwaway SQLite database seeded with N and then
+2N posts, every third one repeating the previous story so clustering has
+work to do. Generation is measured with GENERATION_TOP_K = N / 2, so both
+runs score more candidates than they select, and with GENERATION_TOP_K = 0
+(every post). The model call is replaced by a stub and publishing runs in
+DRYRUN mode, with channel deliveries sent inline and no send budget. Fails
+if the number of SELECT statements grows with N, i.e. if per-post lazy
+loads or re-fetches come back, or if the top-K run did not score more
+rows than it selected.
+
+    python scripts/check_queries.py [--posts 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from datetime import datetime
+import hashlib
+import os
+from pathlib import Path
+import sys
+import tempfile
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/queries.db"
+os.environ["TG_TARGET_CHANNEL"] = ""
+sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import delete, event, func, select  # noqa: E402
+
+from app import tasks  # noqa: E402
+from app.ai import generator  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, SessionLocal, engine, init_db  # noqa: E402
+from app.models import NewsItem, Post, PostStatus  # noqa: E402
+
+
+def _story_text(story: int, words: int) -> str:
+    # distinct 6-char tokens per story, so only repeated stories cluster
+    return " ".join(hashlib.md5(f"{story}-{k}".encode()).hexdigest()[:6] for k in range(words))
+
+
+def seed(n_posts: int) -> None:
+    with SessionLocal() as db:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(delete(table))
+        now = datetime.utcnow()
+        for i in range(n_posts):
+            story = i - 1 if i % 3 == 2 else i
+            news = NewsItem(
+                source=f"bench{i % 3}",
+                title=_story_text(story, 6),
+                url=f"https://example.com/{i}",
+                summary=_story_text(story, 40),
+                published_at=now,
+                fingerprint=f"{i:064x}",
+            )
+            db.add(news)
+            db.flush()
+            db.add(Post(news_id=news.id, status=PostStatus.new))
+        db.commit()
+
+
+def count_selects(run) -> int:
+    counts: Counter[str] = Counter()
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        counts[statement.lstrip().split(None, 1)[0].upper()] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return counts["SELECT"]
+
+
+class _NoLock:
+    def reacquire(self) -> None:
+        pass
+
+
+def count_posts(*where) -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(Post).where(*where))
+
+
+def measure(n_posts: int) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Return (generate, publish) SELECT counts and (scored, selected) posts."""
+    seed(n_posts)
+    generated = count_selects(tasks.ai_generate_posts_task)
+    rows = (count_posts(Post.score.is_not(None)), count_posts(Post.status == PostStatus.generated))
+    published = count_selects(tasks.publish_posts_task)
+    return (generated, published), rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20)
+    args = parser.parse_args()
+
+    init_db()
+    top_k = max(1, args.posts // 2)
+    generator.generate_telegram_post = lambda news, priority=1.0: f"Post about {news.title}"
+    generator.generate_cluster_post = lambda items, priority=1.0: f"Post about {items[0].title}"
+    tasks.bump_version = lambda *namespaces: None
+    tasks.deliver_channel_task.delay = lambda channel_id: tasks.run_sync(
+        tasks._deliver_channel(channel_id, _NoLock()))
+    settings.CHANNEL_RATE_PER_HOUR = 0
+    settings.CHANNEL_MIN_INTERVAL_SECONDS = 0
+
+    failed = False
+    for label, k in ((f"top-{top_k}", top_k), ("all", 0)):
+        settings.GENERATION_TOP_K = k
+        small, small_rows = measure(args.posts)
+        large, large_rows = measure(args.posts * 2)
+        print(f"GENERATION_TOP_K={k}:")
+        for name, a, b in zip(("generate", "publish"), small, large):
+            print(f"  {name:>8}: {a} SELECTs for {args.posts} posts, {b} for {args.posts * 2}")
+        for name, a, b in zip(("scored", "selected"), small_rows, large_rows):
+            print(f"  {name:>8}: {a} posts of {args.posts}, {b} of {args.posts * 2}")
+        if small != large:
+            print(f"FAIL ({label}): SELECT count grows with the number of posts")
+            failed = True
+        if k and not all(scored > selected == k for scored, selected in (small_rows, large_rows)):
+            print(f"FAIL ({label}): expected more scored than selected posts and {k} selected")
+            failed = True
+
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Check that overlapping SQLite sessions do not lock each other out.
+
+Sessions run in explicit transactions (see app.database), so a session that
+only read something still holds its transaction until it commits. Against a
+throwaway file database this checks that the database is in WAL mode, that
+another session can commit while a read transaction is open, and that rows
+written in a savepoint roll back with the outer transaction.
+
+    python scripts/check_sqlite_locking.py
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/locking.db"
+sys.path.insert(0, str(BASE_DIR))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models import Source, SourceType  # noqa: E402
+
+MAX_COMMIT_SECONDS = 1.0
+
+
+def _source(name: str) -> Source:
+    return Source(type=SourceType.site, name=name, url=f"https://example.com/{name}")
+
+
+def _count(db) -> int:
+    return db.scalar(select(func.count()).select_from(Source))
+
+
+def main() -> int:
+    init_db()
+    failed = False
+
+    with SessionLocal() as db:
+        mode = db.execute(text("PRAGMA journal_mode")).scalar()
+    print(f"journal_mode: {mode}")
+    if mode != "wal":
+        print("FAIL: the database is not in WAL mode")
+        failed = True
+
+    # a reader keeps its transaction open while a writer commits
+    with SessionLocal() as reader, SessionLocal() as writer:
+        before = _count(reader)
+        writer.add(_source("overlap"))
+        started = time.monotonic()
+        try:
+            writer.commit()
+        except Exception as e:
+            print(f"FAIL: commit during an open read transaction: {e}")
+            failed = True
+        else:
+            elapsed = time.monotonic() - started
+            print(f"commit during a read transaction: {elapsed:.3f}s")
+            if elapsed > MAX_COMMIT_SECONDS:
+                print("FAIL: the commit waited for the reader")
+                failed = True
+        if _count(reader) != before:
+            print("FAIL: the reader's snapshot changed inside its transaction")
+            failed = True
+        reader.commit()
+        if _count(reader) != before + 1:
+            print("FAIL: the committed row is not visible after the reader commits")
+            failed = True
+
+    # savepoint rows go away with the outer rollback
+    with SessionLocal() as db:
+        before = _count(db)
+        with db.begin_nested():
+            db.add(_source("savepoint"))
+        db.rollback()
+        if _count(db) != before:
+            print("FAIL: a savepoint row survived the outer rollback")
+            failed = True
+
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
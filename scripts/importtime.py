@@ -0,0 +1,75 @@
+"""Measure cold-start import time of the Celery worker and the API.
+
+Runs each entry point in a fresh interpreter with ``-X importtime`` and
+prints its total import time plus its direct imports ranked by cumulative
+time.
+
+    python scripts/importtime.py [--top 15] [--runs 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "worker": "celery_worker",
+    "api": "app.main",
+}
+
+
+def measure(module: str) -> tuple[int, list[tuple[int, str]]]:
+    """Return the module's cumulative microseconds and (cumulative us, name) of its direct imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    # lines come in post-order: a module's imports, two spaces deeper per
+    # level, are printed before the module itself
+    children: list[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                return int(cumulative), children
+            children = []
+
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, module in ENTRY_POINTS.items():
+        totals = []
+        modules: list[tuple[int, str]] = []
+        for _ in range(args.runs):
+            total, modules = measure(module)
+            totals.append(total)
+
+        print(f"{label}: {statistics.median(totals) / 1000:.1f} ms (median of {args.runs}, `import {module}`)")
+        for us, name in sorted(modules, reverse=True)[:args.top]:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()